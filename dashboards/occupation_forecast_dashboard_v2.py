@@ -18,19 +18,28 @@ import streamlit as st
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DATA_PATH = REPO_ROOT / "data" / "processed" / "mi_occ_segment_totals_2024_2034.csv"
+# Parquet copy written next to the CSV; much faster to load when present
+PARQUET_PATH = DATA_PATH.with_suffix(".parquet")
 CORE_SERIES_PATH = REPO_ROOT / "data" / "processed" / "mi_qcew_segment_employment_timeseries_coreauto_extended_compare.csv"
 COLORS_PATH = REPO_ROOT / "config" / "colors.json"
 DEFAULT_METHOD = "lightcast_moody"
 
-with open(COLORS_PATH, "r", encoding="utf-8") as _f:
-    COLORS = json.load(_f)
+
+@st.cache_resource(show_spinner=False)
+def load_colors() -> dict:
+    # Parsed once per server process and shared across reruns and sessions
+    return json.loads(COLORS_PATH.read_bytes())
+
+
+COLORS = load_colors()
 TEAL = COLORS.get("teal", "#2B9CB4")
 
 
 @st.cache_data(show_spinner=False)
 def load_forecasts() -> pd.DataFrame:
-    df = pd.read_csv(DATA_PATH)
+    df = pd.read_parquet(PARQUET_PATH) if PARQUET_PATH.exists() else pd.read_csv(DATA_PATH)
     df["methodology"] = df["methodology"].astype(str)
+    df["occcd"] = df["occcd"].astype(str)
     df["segment_name"] = df["segment_name"].astype(str)
     df["soctitle"] = df["soctitle"].astype(str)
     df["ep_edu_grouped"] = df["ep_edu_grouped"].fillna("Unreported")
@@ -56,6 +65,19 @@ def format_number(value: float, suffix: str = "") -> str:
     return f"{value:,.0f}{suffix}"
 
 
+def format_numbers(values) -> list[str]:
+    """format_number for a whole column: scale and unit are chosen with NumPy, then one f-string per value."""
+    v = np.asarray(values, dtype=float)
+    magnitude = np.abs(v)
+    conditions = [magnitude >= 1_000_000, magnitude >= 1_000]
+    scaled = v / np.select(conditions, [1_000_000, 1_000], default=1)
+    units = np.select(conditions, ["M", "K"], default="")
+    return [
+        "-" if np.isnan(x) else (f"{x:.1f}{unit}" if unit else f"{x:,.0f}")
+        for x, unit in zip(scaled, units)
+    ]
+
+
 def render_method_card(
     container, method_name: str, latest: float, base: float, delta: float, delta_pct: float, base_year: int, latest_year: int
 ) -> None:
@@ -187,12 +209,10 @@ def layout_overview(df: pd.DataFrame, selected_methods: List[str]) -> None:
         ["method", f"Employment {base_year}", f"Employment {latest_year}", "Abs change", "% change"]
     ]
     summary_df = summary_df.rename(columns={"method": "Methodology"})
-    summary_df["Abs change"] = summary_df["Abs change"].apply(format_number)
-    summary_df[f"Employment {base_year}"] = summary_df[f"Employment {base_year}"].apply(format_number)
-    summary_df[f"Employment {latest_year}"] = summary_df[f"Employment {latest_year}"].apply(format_number)
-    summary_df["% change"] = summary_df["% change"].apply(
-        lambda v: f"{v:.1f}%" if not np.isnan(v) else "-"
-    )
+    for col in ("Abs change", f"Employment {base_year}", f"Employment {latest_year}"):
+        summary_df[col] = format_numbers(summary_df[col])
+    pct = summary_df["% change"].to_numpy(dtype=float)
+    summary_df["% change"] = np.where(np.isnan(pct), "-", [f"{v:.1f}%" for v in pct])
 
     with st.expander("Methodology comparison", expanded=False):
         st.dataframe(summary_df.set_index("Methodology"), use_container_width=True)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Shared CSV/Parquet helpers for the pipeline scripts.
+
+pandas' `DataFrame.to_csv` formats every value through Python `str()`; the
+PyArrow writer does the same work in C++ across threads. pyarrow ships with
+streamlit, so it is already part of the environment.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+
+def write_csv(df: pd.DataFrame, path: Path) -> None:
+    """Write `df` to `path` as CSV (no index) using PyArrow's writer."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pa_csv.write_csv(table, str(path))
+
+
+def write_parquet(df: pd.DataFrame, path: Path) -> None:
+    """Write `df` to `path` as zstd-compressed Parquet (no index)."""
+    df.to_parquet(path, engine="pyarrow", compression="zstd", index=False)
+
+
+def read_csv_cached(
+    csv_path: Path,
+    cache_dir: Path,
+    columns: list[str] | None = None,
+    filters: list | None = None,
+) -> pd.DataFrame:
+    """
+    Read `csv_path` through a Parquet copy in `cache_dir` (same stem), rebuilding the
+    copy when the CSV is newer. `columns` and `filters` are passed to `pd.read_parquet`.
+    """
+    parquet_path = Path(cache_dir) / Path(csv_path).with_suffix(".parquet").name
+    if not (parquet_path.exists() and parquet_path.stat().st_mtime >= Path(csv_path).stat().st_mtime):
+        write_parquet(pd.read_csv(csv_path), parquet_path)
+    return pd.read_parquet(parquet_path, engine="pyarrow", columns=columns, filters=filters)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Shared Excel engine settings for the pipeline scripts.
+
+`EXCEL_ENGINE` is passed as `engine=` to `pd.read_excel` / `pd.ExcelFile`.
+It selects python-calamine when that package is installed and pandas supports
+it (pandas >= 2.2); otherwise it is None and pandas uses openpyxl.
+`EXCEL_WRITER_ENGINE` is passed as `engine=` to `pd.ExcelWriter`.
+
+Note: requirements.txt pins pandas 2.1.4, so with the pinned environment
+`EXCEL_ENGINE` is always None (openpyxl). The calamine branch only takes
+effect after pandas is upgraded to 2.2 or later.
+"""
+from __future__ import annotations
+
+import importlib.util
+
+import pandas as pd
+
+_PANDAS_HAS_CALAMINE = tuple(int(p) for p in pd.__version__.split(".")[:2]) >= (2, 2)
+EXCEL_ENGINE = (
+    "calamine"
+    if _PANDAS_HAS_CALAMINE and importlib.util.find_spec("python_calamine") is not None
+    else None
+)
+
+# xlsxwriter writes workbooks roughly twice as fast as openpyxl; pandas falls back to openpyxl without it
+EXCEL_WRITER_ENGINE = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") is not None else None
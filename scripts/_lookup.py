@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Shared loader for the NAICS -> segment lookup (data/lookups/segment_assignments.csv).
+
+The CSV is read and normalized once per process: `naics_code` is kept as a
+stripped, zero-padded 4-character string and the segment columns are checked.
+Callers receive their own copy, so they can add or drop columns freely.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LOOKUP_PATH = REPO_ROOT / "data" / "lookups" / "segment_assignments.csv"
+
+REQUIRED_COLUMNS = {"naics_code", "segment_id", "segment_name", "stage"}
+
+
+@lru_cache(maxsize=None)
+def _read_segments() -> pd.DataFrame:
+    df = pd.read_csv(LOOKUP_PATH, dtype={"naics_code": str})
+    missing = REQUIRED_COLUMNS - set(df.columns)
+    if missing:
+        raise KeyError(f"Missing columns in segment lookup: {missing}")
+    df["naics_code"] = df["naics_code"].str.strip().str.zfill(4)
+    return df
+
+
+def load_segments() -> pd.DataFrame:
+    """The full segment lookup, one row per CSV row, as a fresh copy."""
+    return _read_segments().copy()
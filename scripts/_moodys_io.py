@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Cached loader for the Moody's supply-chain workbook.
+
+The workbook is parsed once and stored as Parquet under data/interim; later
+calls read the Parquet copy (optionally only the requested columns). The cache
+is rebuilt whenever the workbook is newer than it. The workbook is parsed with
+python-calamine when `_excel_io.EXCEL_ENGINE` selects it, otherwise by
+streaming the first sheet with openpyxl in read-only mode.
+"""
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from _excel_io import EXCEL_ENGINE
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RAW_PATH = REPO_ROOT / "data" / "raw" / "Moody's Supply Chain Employment and Output 1970-2055.xlsx"
+CACHE_PATH = REPO_ROOT / "data" / "interim" / "moodys_supply_chain.parquet"
+
+# Parquet needs string column names; the workbook's period columns are datetimes
+_DATE_COL_FORMAT = "%Y-%m-%d"
+_DATE_COL_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_NAICS4_RE = re.compile(r"(\d{4})")
+
+
+def _to_cache_name(col) -> str:
+    if isinstance(col, datetime):
+        return col.strftime(_DATE_COL_FORMAT)
+    return str(col)
+
+
+def _from_cache_name(col: str):
+    if _DATE_COL_RE.fullmatch(col):
+        return pd.Timestamp(col)
+    return col
+
+
+def _cache_is_fresh() -> bool:
+    return CACHE_PATH.exists() and CACHE_PATH.stat().st_mtime >= RAW_PATH.stat().st_mtime
+
+
+def _read_workbook() -> pd.DataFrame:
+    if EXCEL_ENGINE is not None:
+        return pd.read_excel(RAW_PATH, engine=EXCEL_ENGINE)
+
+    # Read-only mode streams the cell values without building the workbook's object tree
+    import openpyxl
+
+    wb = openpyxl.load_workbook(RAW_PATH, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows)
+        df = pd.DataFrame(rows, columns=header)
+    finally:
+        wb.close()
+    return df.dropna(how="all").reset_index(drop=True)
+
+
+def _normalize_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Give every column a single Parquet-compatible type: period columns become numeric
+    (the early years mix values with "ND" placeholders, which become NaN) and any other
+    mixed object column is stringified, keeping missing values missing.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(col, datetime):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        elif df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _build_cache() -> pd.DataFrame:
+    # Normalized before writing so the first run returns the same dtypes as later cached reads
+    df = _normalize_types(_read_workbook())
+    cached = df.rename(columns=_to_cache_name)
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    cached.to_parquet(CACHE_PATH, engine="pyarrow", compression="zstd", index=False)
+    return df
+
+
+def load_moodys(columns: Iterable | None = None, nrows: int | None = None) -> pd.DataFrame:
+    """
+    Load the Moody's workbook as a DataFrame with the original column labels
+    (period columns as Timestamps). `columns` limits the read to those columns;
+    `nrows` reads only the first rows.
+    """
+    if not _cache_is_fresh():
+        df = _build_cache()
+        df = df[list(columns)] if columns is not None else df
+        return df.head(nrows) if nrows is not None else df
+
+    names = [_to_cache_name(c) for c in columns] if columns is not None else None
+    if nrows is None:
+        df = pd.read_parquet(CACHE_PATH, columns=names)
+    else:
+        batch = next(pq.ParquetFile(CACHE_PATH).iter_batches(batch_size=nrows, columns=names))
+        df = batch.to_pandas()
+    return df.rename(columns=_from_cache_name)
+
+
+def add_metric_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Add `metric` (description prefix) and 4-digit `naics_code` (from the mnemonic)."""
+    return df.assign(
+        metric=df['Description:'].str.split(':').str[0].str.strip(),
+        naics_code=df['Mnemonic:'].str.extract(_NAICS4_RE).iloc[:, 0].str.zfill(4)
+    )
@@ -5,6 +5,8 @@ from __future__ import annotations
 from pathlib import Path
 import pandas as pd
 
+from _csv_io import write_csv
+
 # ---------------------
 # Repo-relative paths
 # ---------------------
@@ -137,29 +139,38 @@ def build_stage_compare(lc_base: pd.DataFrame, lc_cmp: pd.DataFrame,
     out = out.sort_values(["stage", "year", "adjustment_source", "forecast_source", "value_type"]).reset_index(drop=True)
     return out
 
+
+def _sum_by_keys(df: pd.DataFrame, keys: list[str], value_col: str) -> pd.DataFrame:
+    """
+    Sum `value_col` per unique combination of `keys` (NA sum when a group has no values).
+    Rows with a missing key are skipped, matching groupby's default dropna.
+    """
+    keyed = df.dropna(subset=keys)
+    codes, uniques = pd.MultiIndex.from_frame(keyed[keys]).factorize(sort=True)
+    # Grouping on the integer codes keeps groupby's compensated summation, so totals match it exactly
+    sums = keyed[value_col].groupby(codes).sum(min_count=1)
+
+    out = uniques.to_frame(index=False, name=keys)
+    out[value_col] = sums.to_numpy()
+    return out
+
+
 def add_segment_total(seg_df: pd.DataFrame) -> pd.DataFrame:
     """
     Append a 'Total (All Segments)' row per (year, value_type, forecast_source, adjustment_source).
     Leaves applied_yoy_pct as NA for totals.
     """
     base_keys = ["year", "value_type", "forecast_source", "adjustment_source"]
-    totals = (
-        seg_df.groupby(base_keys, as_index=False)["employment_qcew"]
-              .sum(min_count=1)
-    )
+    totals = _sum_by_keys(seg_df, base_keys, "employment_qcew")
     totals["segment_id"] = 0
     totals["segment_name"] = "Total (All Segments)"
     totals["applied_yoy_pct"] = pd.NA
 
-    # Reorder to match seg_df columns and append
-    totals = totals[seg_df.columns]
-    out = pd.concat([seg_df, totals], ignore_index=True)
-
-    # Keep 'Total' last in sorts
-    out["__seg_order"] = (out["segment_id"] == 0).astype(int)
-    out = out.sort_values(["__seg_order", "segment_id", "year",
-                           "adjustment_source", "forecast_source", "value_type"]).drop(columns="__seg_order")
-    return out.reset_index(drop=True)
+    # Sort each part on its own and append totals last
+    order = ["year", "adjustment_source", "forecast_source", "value_type"]
+    seg_sorted = seg_df.sort_values(["segment_id", *order])
+    totals = totals[seg_df.columns].sort_values(order)
+    return pd.concat([seg_sorted, totals], ignore_index=True)
 
 
 def add_stage_total(stg_df: pd.DataFrame) -> pd.DataFrame:
@@ -168,21 +179,15 @@ def add_stage_total(stg_df: pd.DataFrame) -> pd.DataFrame:
     Leaves applied_yoy_pct as NA for totals.
     """
     base_keys = ["year", "value_type", "forecast_source", "adjustment_source"]
-    totals = (
-        stg_df.groupby(base_keys, as_index=False)["employment_qcew"]
-              .sum(min_count=1)
-    )
+    totals = _sum_by_keys(stg_df, base_keys, "employment_qcew")
     totals["stage"] = "Total"
     totals["applied_yoy_pct"] = pd.NA
 
-    totals = totals[stg_df.columns]
-    out = pd.concat([stg_df, totals], ignore_index=True)
-
-    # Keep 'Total' last in sorts
-    out["__stg_order"] = (out["stage"] == "Total").astype(int)
-    out = out.sort_values(["__stg_order", "stage", "year",
-                           "adjustment_source", "forecast_source", "value_type"]).drop(columns="__stg_order")
-    return out.reset_index(drop=True)
+    # Sort each part on its own and append totals last
+    order = ["year", "adjustment_source", "forecast_source", "value_type"]
+    stg_sorted = stg_df.sort_values(["stage", *order])
+    totals = totals[stg_df.columns].sort_values(order)
+    return pd.concat([stg_sorted, totals], ignore_index=True)
 
 
 def main():
@@ -204,8 +209,8 @@ def main():
     seg_all = add_segment_total(seg_all)
     stg_all = add_stage_total(stg_all)
 
-    seg_all.to_csv(OUT_SEG_ALL, index=False)
-    stg_all.to_csv(OUT_STG_ALL, index=False)
+    write_csv(seg_all, OUT_SEG_ALL)
+    write_csv(stg_all, OUT_STG_ALL)
 
     print(f"Wrote: {OUT_SEG_ALL}")
     print(f"Wrote: {OUT_STG_ALL}")
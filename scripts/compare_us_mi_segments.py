@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import re
 from pathlib import Path
 
 import pandas as pd
 
+from _csv_io import write_csv
+
 US_LONG_PATH = Path('data/interim/us_staffing_segments_long_2024_2034.csv')
 MI_WIDE_PATH = Path('data/interim/mcda_staffing_wide_2021_2024_enriched.csv')
 MAJOR_OUTPUT = Path('data/processed/us_mi_segment_comparison_major.csv')
@@ -14,6 +17,7 @@ FLAGS_OUTPUT = Path('data/processed/us_mi_segment_comparison_flags.csv')
 MAJOR_CODES = {'major'}
 DETAILED_CODES = {'detailed'}
 SUMMARY_SUFFIX = '-0000'
+_LEADING_NUM_RE = re.compile(r'^(\d+)')
 
 SEGMENT_LABELS = {
     1: '1. Materials & Processing',
@@ -48,7 +52,7 @@ def load_mi_data() -> pd.DataFrame:
     df = pd.read_csv(MI_WIDE_PATH)
     df.rename(columns={'segment_name': 'segment_label_raw'}, inplace=True)
     df['segment_label_raw'] = df['segment_label_raw'].astype(str).str.strip()
-    df['segment_id'] = pd.to_numeric(df['segment_label_raw'].str.extract(r'^(\d+)')[0], errors='coerce', downcast='integer')
+    df['segment_id'] = pd.to_numeric(df['segment_label_raw'].str.extract(_LEADING_NUM_RE)[0], errors='coerce', downcast='integer')
     df['segment_label_mi'] = df['segment_id'].map(SEGMENT_LABELS).combine_first(df['segment_label_raw'])
     df['occ_level'] = df['occ_level'].astype(str).str.lower()
     df['occcd'] = df['occcd'].astype(str).str.strip()
@@ -124,12 +128,12 @@ def main() -> None:
     major_comparison, major_flags = prepare_major_comparison(us_df, mi_df)
     detailed_comparison, detailed_flags = prepare_detailed_comparison(us_df, mi_df)
 
-    major_comparison.to_csv(MAJOR_OUTPUT, index=False)
-    detailed_comparison.to_csv(DETAILED_OUTPUT, index=False)
+    write_csv(major_comparison, MAJOR_OUTPUT)
+    write_csv(detailed_comparison, DETAILED_OUTPUT)
 
     flags = pd.concat([major_flags, detailed_flags], ignore_index=True)
     if not flags.empty:
-        flags.to_csv(FLAGS_OUTPUT, index=False)
+        write_csv(flags, FLAGS_OUTPUT)
     elif FLAGS_OUTPUT.exists():
         FLAGS_OUTPUT.unlink()
 
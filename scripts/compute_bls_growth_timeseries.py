@@ -3,8 +3,11 @@ from __future__ import annotations
 
 from pathlib import Path
 import math
+import numpy as np
 import pandas as pd
 
+from _csv_io import write_csv
+
 # ---------------------
 # Repo-relative paths
 # ---------------------
@@ -23,6 +26,7 @@ OCCUPATION_CODE_TARGET = "00-0000"  # Total, all occupations
 Y_START = 2024
 Y_END = 2034
 YEARS_YOY = list(range(Y_START + 1, Y_END + 1))  # 2025..2034 inclusive
+YEARS_YOY_ARR = np.array(YEARS_YOY, dtype=int)
 # Column name candidates in the source file (be flexible)
 OCC_CODE_COLS = ["Occupation Code", "occupation_code", "occ_code", "OCC_CODE"]
 OCC_TITLE_COLS = ["Occupation Title", "occupation_title", "occ_title", "OCC_TITLE"]
@@ -123,16 +127,24 @@ def _compute_cagr(emp24: float, emp34: float) -> float | None:
     except Exception:
         return None
 
-def _expand_yoy_timeseries(keys: dict, cagr_dec: float) -> pd.DataFrame:
+def _expand_yoy_timeseries(keys: dict, cagr_dec: float | None) -> dict[str, np.ndarray]:
     """
-    Make rows years 2025..2034 with employment_yoy_pct in percent units.
+    Make column arrays for years 2025..2034 with employment_yoy_pct in percent units.
     keys: e.g., {"segment_id": 1, "segment_name": "..."} or {"stage": "Upstream"}
     """
-    if cagr_dec is None or math.isnan(cagr_dec):
-        # emit NaNs to preserve shape; consumer can drop later if desired
-        return pd.DataFrame([{**keys, "year": y, "employment_yoy_pct": pd.NA} for y in YEARS_YOY])
-    pct = cagr_dec * 100.0
-    return pd.DataFrame([{**keys, "year": y, "employment_yoy_pct": pct} for y in YEARS_YOY])
+    n = len(YEARS_YOY_ARR)
+    # NaN (not dropped) preserves shape; consumer can drop later if desired
+    pct = np.nan if cagr_dec is None or math.isnan(cagr_dec) else cagr_dec * 100.0
+    cols = {k: np.full(n, v, dtype=object if isinstance(v, str) else None) for k, v in keys.items()}
+    cols["year"] = YEARS_YOY_ARR
+    cols["employment_yoy_pct"] = np.full(n, pct, dtype=float)
+    return cols
+
+def _concat_expanded(rows: list[dict[str, np.ndarray]], columns: list[str]) -> pd.DataFrame:
+    """Concatenate _expand_yoy_timeseries outputs column-wise into one frame."""
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame({c: np.concatenate([r[c] for r in rows]) for c in columns})
 
 def main() -> None:
     bls = _read_bls_source()
@@ -149,11 +161,9 @@ def main() -> None:
             {"segment_id": int(r["segment_id"]), "segment_name": str(r["segment_name"])},
             cagr
         ))
-    seg_yoy = pd.concat(seg_rows, ignore_index=True) if seg_rows else pd.DataFrame(
-        columns=["segment_id", "segment_name", "year", "employment_yoy_pct"]
-    )
+    seg_yoy = _concat_expanded(seg_rows, ["segment_id", "segment_name", "year", "employment_yoy_pct"])
     seg_yoy = seg_yoy.sort_values(["segment_id", "year"]).reset_index(drop=True)
-    seg_yoy.to_csv(OUT_SEG, index=False)
+    write_csv(seg_yoy, OUT_SEG)
 
     # ---------------
     # STAGE-LEVEL YoY
@@ -165,15 +175,13 @@ def main() -> None:
     for _, r in stg_sum.iterrows():
         cagr = _compute_cagr(r["emp_2024"], r["emp_2034"])
         stg_rows.append(_expand_yoy_timeseries({"stage": str(r["stage"])}, cagr))
-    stg_yoy = pd.concat(stg_rows, ignore_index=True) if stg_rows else pd.DataFrame(
-        columns=["stage", "year", "employment_yoy_pct"]
-    )
+    stg_yoy = _concat_expanded(stg_rows, ["stage", "year", "employment_yoy_pct"])
     # Stage ordering helpful for downstream plots
     stage_order = pd.CategoricalDtype(categories=["Upstream", "OEM", "Downstream"], ordered=True)
     if "stage" in stg_yoy.columns:
         stg_yoy["stage"] = stg_yoy["stage"].astype(str).astype(stage_order)
         stg_yoy = stg_yoy.sort_values(["stage", "year"]).reset_index(drop=True)
-    stg_yoy.to_csv(OUT_STG, index=False)
+    write_csv(stg_yoy, OUT_STG)
 
     print(f"Wrote: {OUT_SEG}  (rows={len(seg_yoy)})")
     print(f"Wrote: {OUT_STG}  (rows={len(stg_yoy)})")
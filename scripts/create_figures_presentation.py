@@ -1,7 +1,8 @@
-﻿from pathlib import Path
+﻿import io
+from pathlib import Path
 from datetime import datetime
 from pptx import Presentation
-from pptx.util import Inches, Pt
+from pptx.util import Emu, Inches, Pt
 from PIL import Image
 
 Image.MAX_IMAGE_PIXELS = None
@@ -22,6 +23,23 @@ def format_title(file_path: Path) -> str:
     return name.title()
 
 
+def fit_picture_size(image: Image.Image, max_width: int, max_height: int) -> tuple[int, int]:
+    """Native picture size in EMU (python-pptx's 72 dpi default), scaled down to fit the bounds."""
+    dpi_x, dpi_y = image.info.get("dpi", (72, 72))
+    width = int(image.width / (dpi_x or 72) * Inches(1))
+    height = int(image.height / (dpi_y or 72) * Inches(1))
+
+    if width > max_width:
+        ratio = max_width / width
+        width = int(width * ratio)
+        height = int(height * ratio)
+    if height > max_height:
+        ratio = max_height / height
+        width = int(width * ratio)
+        height = int(height * ratio)
+    return width, height
+
+
 def add_footer(slide, text: str) -> None:
     textbox = slide.shapes.add_textbox(Inches(0.5), Inches(6.8), Inches(9), Inches(0.4))
     tf = textbox.text_frame
@@ -32,9 +50,11 @@ def add_footer(slide, text: str) -> None:
 
 
 def main() -> None:
+    # preview/ holds low-resolution notebook drafts; their published copies live in publish/
     images = sorted([
         p for p in FIGURE_DIR.glob("**/*")
         if p.suffix.lower() in IMAGE_EXTENSIONS and p.name != ".gitkeep"
+        and "preview" not in p.relative_to(FIGURE_DIR).parts[:-1]
     ], key=lambda p: p.as_posix())
 
     if not images:
@@ -66,22 +86,14 @@ def main() -> None:
             title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.2), Inches(9), Inches(0.6))
             title_box.text_frame.text = format_title(image_path)
 
-        pic = slide.shapes.add_picture(str(image_path), Inches(0.5), Inches(1.2))
-
-        max_width = Inches(9.0)
-        max_height = Inches(5.5)
-
-        if pic.width > max_width:
-            ratio = max_width / pic.width
-            pic.width = int(pic.width * ratio)
-            pic.height = int(pic.height * ratio)
-        if pic.height > max_height:
-            ratio = max_height / pic.height
-            pic.width = int(pic.width * ratio)
-            pic.height = int(pic.height * ratio)
+        # Read the file once; the same buffer feeds PIL (size) and python-pptx (embed)
+        buffer = io.BytesIO(image_path.read_bytes())
+        with Image.open(buffer) as image:
+            width, height = fit_picture_size(image, Inches(9.0), Inches(5.5))
+        buffer.seek(0)
 
-        pic.left = int((prs.slide_width - pic.width) / 2)
-        pic.top = Inches(1.4)
+        left = int((prs.slide_width - width) / 2)
+        slide.shapes.add_picture(buffer, left, Inches(1.4), width=Emu(width), height=Emu(height))
 
         add_footer(slide, SOURCE_TEXT)
 
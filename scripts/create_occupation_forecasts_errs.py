@@ -9,19 +9,36 @@ This script generates occupation-level projections by:
 Outputs:
 - Occupation-level employment by segment, year, methodology, and attribution
 - Special focus on 2030 projections
-- Separate files for BEA vs. Lightcast attribution approaches
+- Parquet dataset partitioned by attribution (BEA vs. Lightcast) and year
 """
 
+import hashlib
+import shutil
+
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 from pathlib import Path
 
+from _csv_io import read_csv_cached
+
 # Define paths
 BASE_DIR = Path(__file__).parent.parent
 DATA_RAW = BASE_DIR / "data" / "raw"
 DATA_INTERIM = BASE_DIR / "data" / "interim"
 DATA_PROCESSED = BASE_DIR / "data" / "processed"
 
+# Columns read from each BLS us_staffing_<naics>.csv (everything else is skipped at parse time)
+BLS_STAFFING_COLUMN_TYPES = {
+    'Occupation Type': pa.string(),
+    'Occupation Code': pa.string(),
+    'Occupation Title': pa.string(),
+    '2024 Percent of Industry': pa.float64(),
+    'Projected 2034 Percent of Industry': pa.float64(),
+}
+
 print("=" * 80)
 print("OCCUPATION-LEVEL FORECAST GENERATION")
 print("=" * 80)
@@ -32,30 +49,38 @@ print("=" * 80)
 print("\n[1/6] Loading core datasets...")
 
 # Load MCDA 2024 staffing patterns
-mcda = pd.read_csv(DATA_INTERIM / "mcda_staffing_long_2021_2024.csv")
-mcda_2024 = mcda[mcda['year'] == 2024].copy()
-
-# Filter out "Total" rows (cross-segment aggregates)
-mcda_2024 = mcda_2024[mcda_2024['segment'] != 'Total'].copy()
-
-# Filter to detailed occupations only (avoid double-counting from major/broad summaries)
+MCDA_PATH = DATA_INTERIM / "mcda_staffing_long_2021_2024.csv"
+mcda = pd.read_csv(MCDA_PATH)
+# One mask, one copy: 2024 rows, excluding "Total" rows (cross-segment aggregates),
+# detailed occupations only (avoid double-counting from major/broad summaries)
 # Occupation hierarchy: 00-0000 (grand total) > XX-0000 (major) > broad > detailed (leaf level)
-mcda_2024 = mcda_2024[mcda_2024['occ_level'] == 'detailed'].copy()
+mcda_2024 = mcda.loc[
+    (mcda['year'] == 2024) & (mcda['segment'] != 'Total') & (mcda['occ_level'] == 'detailed')
+].copy()
 print(f"  - Loaded MCDA 2024 staffing: {len(mcda_2024)} detailed occupation-segment records")
 
 # Load segment assignments to get NAICS mapping
-segments = pd.read_csv(BASE_DIR / "data" / "lookups" / "segment_assignments.csv")
+SEGMENT_ASSIGNMENTS_PATH = BASE_DIR / "data" / "lookups" / "segment_assignments.csv"
+segments = pd.read_csv(SEGMENT_ASSIGNMENTS_PATH)
+# NAICS-indexed view for lookups (one assignment per NAICS code)
+segments_by_naics = segments.set_index('naics_code', verify_integrity=True)
 print(f"  - Loaded segment assignments: {len(segments)} NAICS codes")
 
 # Load attribution shares
-bea_attr = pd.read_csv(DATA_RAW / "auto_attribution_bea.csv")
+BEA_ATTR_PATH = DATA_RAW / "auto_attribution_bea.csv"
+bea_attr = pd.read_csv(BEA_ATTR_PATH)
 bea_attr = bea_attr.rename(columns={'NAICS': 'naics_code', 'bea_share_to_set': 'auto_share'})
 print(f"  - Loaded BEA attribution: {len(bea_attr)} NAICS codes")
 
-lightcast_attr = pd.read_csv(DATA_RAW / "auto_attribution_core_auto_lightcast.csv")
+LIGHTCAST_ATTR_PATH = DATA_RAW / "auto_attribution_core_auto_lightcast.csv"
+lightcast_attr = pd.read_csv(LIGHTCAST_ATTR_PATH)
 lightcast_attr = lightcast_attr.rename(columns={'naics4': 'naics_code', 'share_to_set': 'auto_share'})
 print(f"  - Loaded Lightcast attribution: {len(lightcast_attr)} NAICS codes")
 
+# Auto share lookups keyed by NAICS
+bea_auto_share = bea_attr.set_index('naics_code', verify_integrity=True)['auto_share']
+lightcast_auto_share = lightcast_attr.set_index('naics_code', verify_integrity=True)['auto_share']
+
 # Load segment employment forecasts (all methodologies)
 forecast_files = {
     'BEA_Moody': 'mi_qcew_segment_employment_timeseries_bea_extended_moody.csv',
@@ -64,9 +89,35 @@ forecast_files = {
     'Lightcast_BLS': 'mi_qcew_segment_employment_timeseries_coreauto_extended_bls.csv',
 }
 
+def load_segment_forecast(filename):
+    """Read a segment forecast CSV via its Parquet copy in data/interim (refreshed when the CSV is newer)."""
+    return read_csv_cached(DATA_PROCESSED / filename, DATA_INTERIM)
+
+def cached(path, inputs, build):
+    """
+    Return the DataFrame stored at `path` (Parquet) if it was built from the same `inputs`;
+    otherwise call `build()` and store its result. Inputs are fingerprinted by name, mtime and
+    size (blake2b), kept next to the Parquet file as `<name>.hash`.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for f in sorted(inputs):
+        stat = f.stat()
+        digest.update(f"{f.name}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+    fingerprint = digest.hexdigest()
+
+    hash_path = path.with_name(path.name + '.hash')
+    if path.exists() and hash_path.exists() and hash_path.read_text() == fingerprint:
+        print(f"  - Reusing cached {path.name}")
+        return pd.read_parquet(path)
+    df = build()
+    df.to_parquet(path, engine='pyarrow', compression='zstd', index=False)
+    hash_path.write_text(fingerprint)
+    return df
+
+# Frames stay in memory for the whole run (Step 4 and the validation block)
 forecasts = {}
 for key, filename in forecast_files.items():
-    df = pd.read_csv(DATA_PROCESSED / filename)
+    df = load_segment_forecast(filename)
     # Filter to projection years only (2024-2034)
     df = df[(df['year'] >= 2024) & (df['year'] <= 2034)]
     forecasts[key] = df
@@ -78,74 +129,80 @@ for key, filename in forecast_files.items():
 print("\n[2/6] Loading BLS occupational shift data...")
 
 # Read all BLS us_staffing files and compile occupation shares
-bls_shifts = []
 us_staffing_dir = DATA_RAW / "us_staffing_patterns"
 
-for naics_file in us_staffing_dir.glob("us_staffing_*.csv"):
-    naics_code = int(naics_file.stem.split('_')[-1])
+# Only parse files whose NAICS is in our segment assignments
+valid_naics = set(segments_by_naics.index)
+staffing_files = [
+    f for f in us_staffing_dir.glob("us_staffing_*.csv")
+    if int(f.stem.split('_')[-1]) in valid_naics
+]
 
-    # Check if this NAICS is in our segment assignments
-    if naics_code not in segments['naics_code'].values:
-        continue
+def build_bls_segment_shifts():
+    """Compile employment-weighted BLS 2024/2034 occupation shares per segment from the staffing files."""
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=list(BLS_STAFFING_COLUMN_TYPES),
+        column_types=BLS_STAFFING_COLUMN_TYPES,
+    )
+    bls_tables = []
+    for naics_file in staffing_files:
+        naics_code = int(naics_file.stem.split('_')[-1])
+        table = pa_csv.read_csv(naics_file, convert_options=convert_options)
 
-    df = pd.read_csv(naics_file)
+        # Keep only line items (detailed occupations)
+        table = table.filter(pc.equal(table['Occupation Type'], 'Line Item'))
+        table = table.append_column('naics_code', pa.array(np.full(table.num_rows, naics_code, dtype=np.int64)))
+        bls_tables.append(table)
 
-    # Get segment for this NAICS
-    segment_info = segments[segments['naics_code'] == naics_code].iloc[0]
-    segment_id = segment_info['segment_id']
-    segment_name = segment_info['segment_name']
+    bls_shifts_df = pa.concat_tables(bls_tables).to_pandas()
 
-    # Keep only line items (detailed occupations)
-    df = df[df['Occupation Type'] == 'Line Item'].copy()
+    # Get segment for each NAICS
+    bls_shifts_df = bls_shifts_df.join(segments_by_naics[['segment_id', 'segment_name']], on='naics_code')
 
     # Extract relevant columns
-    df['naics_code'] = naics_code
-    df['segment_id'] = segment_id
-    df['segment_name'] = segment_name
-    df['occupation_code'] = df['Occupation Code']
-    df['occupation_title'] = df['Occupation Title']
-    df['share_2024'] = df['2024 Percent of Industry'] / 100  # Convert to proportion
-    df['share_2034'] = df['Projected 2034 Percent of Industry'] / 100
-
-    bls_shifts.append(df[['naics_code', 'segment_id', 'segment_name',
-                           'occupation_code', 'occupation_title',
-                           'share_2024', 'share_2034']])
-
-bls_shifts_df = pd.concat(bls_shifts, ignore_index=True)
-
-# Aggregate to segment level (weighted by QCEW employment)
-# Merge with segment assignments to get employment weights
-bls_shifts_df = bls_shifts_df.merge(
-    segments[['naics_code', 'employment_qcew_2024']],
-    on='naics_code'
+    bls_shifts_df = bls_shifts_df.rename(columns={
+        'Occupation Code': 'occupation_code',
+        'Occupation Title': 'occupation_title',
+    })
+    bls_shifts_df['share_2024'] = bls_shifts_df['2024 Percent of Industry'] / 100  # Convert to proportion
+    bls_shifts_df['share_2034'] = bls_shifts_df['Projected 2034 Percent of Industry'] / 100
+    bls_shifts_df = bls_shifts_df[['naics_code', 'segment_id', 'segment_name',
+                                   'occupation_code', 'occupation_title',
+                                   'share_2024', 'share_2034']]
+    # String keys as categoricals: merges/groupbys below hash integer codes instead of objects
+    bls_shifts_df = bls_shifts_df.astype({'segment_name': 'category', 'occupation_code': 'category',
+                                          'occupation_title': 'category'})
+
+    # Aggregate to segment level (weighted by QCEW employment)
+    # Look up employment weights from segment assignments
+    bls_shifts_df['employment_qcew_2024'] = bls_shifts_df['naics_code'].map(segments_by_naics['employment_qcew_2024'])
+
+    # Weight shares by NAICS employment within segment
+    # (denominator is the segment-wide employment total summed over all rows, as before)
+    bls_shifts_df['w24'] = bls_shifts_df['share_2024'] * bls_shifts_df['employment_qcew_2024']
+    bls_shifts_df['w34'] = bls_shifts_df['share_2034'] * bls_shifts_df['employment_qcew_2024']
+    segment_total_emp = bls_shifts_df.groupby('segment_id', sort=False)['employment_qcew_2024'].sum()
+    segment_names = bls_shifts_df.groupby('segment_id', sort=False)['segment_name'].first()
+
+    bls_segment_shifts = (
+        bls_shifts_df.groupby(['segment_id', 'occupation_code'], sort=False, observed=True)
+        .agg(occupation_title=('occupation_title', 'first'), w24=('w24', 'sum'), w34=('w34', 'sum'))
+        .reset_index()
+    )
+    total_emp = bls_segment_shifts['segment_id'].map(segment_total_emp)
+    bls_segment_shifts['segment_name'] = bls_segment_shifts['segment_id'].map(segment_names)
+    bls_segment_shifts['bls_share_2024'] = bls_segment_shifts['w24'] / total_emp
+    bls_segment_shifts['bls_share_2034'] = bls_segment_shifts['w34'] / total_emp
+    bls_segment_shifts = bls_segment_shifts[['segment_id', 'segment_name', 'occupation_code',
+                                             'occupation_title', 'bls_share_2024', 'bls_share_2034']]
+    return bls_segment_shifts
+
+# Cached in data/interim; rebuilt when a staffing file, the segment lookup or this script changes
+bls_segment_shifts = cached(
+    DATA_INTERIM / "bls_segment_shifts.parquet",
+    staffing_files + [SEGMENT_ASSIGNMENTS_PATH, Path(__file__)],
+    build_bls_segment_shifts,
 )
-
-# Weight shares by NAICS employment within segment
-segment_occupation_shares = []
-for segment_id in bls_shifts_df['segment_id'].unique():
-    seg_data = bls_shifts_df[bls_shifts_df['segment_id'] == segment_id]
-
-    # Get total segment employment
-    total_emp = seg_data['employment_qcew_2024'].sum()
-
-    # Group by occupation and compute weighted average shares
-    for occ_code in seg_data['occupation_code'].unique():
-        occ_data = seg_data[seg_data['occupation_code'] == occ_code]
-
-        # Weighted average of shares across NAICS codes in this segment
-        share_2024_weighted = (occ_data['share_2024'] * occ_data['employment_qcew_2024']).sum() / total_emp
-        share_2034_weighted = (occ_data['share_2034'] * occ_data['employment_qcew_2024']).sum() / total_emp
-
-        segment_occupation_shares.append({
-            'segment_id': segment_id,
-            'segment_name': seg_data['segment_name'].iloc[0],
-            'occupation_code': occ_code,
-            'occupation_title': occ_data['occupation_title'].iloc[0],
-            'bls_share_2024': share_2024_weighted,
-            'bls_share_2034': share_2034_weighted
-        })
-
-bls_segment_shifts = pd.DataFrame(segment_occupation_shares)
 print(f"  - Compiled BLS shifts: {len(bls_segment_shifts)} segment-occupation pairs")
 
 # ============================================================================
@@ -153,40 +210,34 @@ print(f"  - Compiled BLS shifts: {len(bls_segment_shifts)} segment-occupation pa
 # ============================================================================
 print("\n[3/6] Adjusting MCDA staffing patterns by auto attribution...")
 
-# Function to compute segment-level weighted auto share
-def get_segment_auto_share(segment_id, attribution_df):
-    """Get employment-weighted auto share for a segment."""
-    seg_naics = segments[segments['segment_id'] == segment_id]['naics_code'].values
-
-    # Merge segment NAICS with attribution
-    seg_attr = segments[segments['segment_id'] == segment_id][['naics_code', 'employment_qcew_2024']]
-    seg_attr = seg_attr.merge(attribution_df[['naics_code', 'auto_share']], on='naics_code', how='left')
-
-    # Fill missing auto shares with 0 (assume non-auto)
-    seg_attr['auto_share'] = seg_attr['auto_share'].fillna(0)
+# Function to compute segment-level weighted auto shares
+def get_segment_auto_shares(auto_share):
+    """Get employment-weighted auto share for every segment (Series indexed by segment_id)."""
+    # Align NAICS auto shares to the segment assignments; missing shares are 0 (assume non-auto)
+    share = auto_share.reindex(segments_by_naics.index).fillna(0)
 
     # Weighted average
-    total_emp = seg_attr['employment_qcew_2024'].sum()
-    weighted_share = (seg_attr['auto_share'] * seg_attr['employment_qcew_2024']).sum() / total_emp
-
-    return weighted_share
+    emp = segments_by_naics['employment_qcew_2024']
+    seg = segments_by_naics['segment_id']
+    return (share * emp).groupby(seg).sum() / emp.groupby(seg).sum()
 
 # Extract segment ID from segment column first (format: "1. Materials & Processing")
 mcda_2024['segment_id'] = mcda_2024['segment'].str.split('.').str[0].str.strip().astype(int)
+mcda_2024 = mcda_2024.astype({'segment': 'category', 'occcd': 'category', 'soctitle': 'category'})
 
 # Compute auto shares for each segment
-segment_auto_shares = []
-for segment_id in sorted(mcda_2024['segment_id'].unique()):
-    bea_share = get_segment_auto_share(segment_id, bea_attr)
-    lightcast_share = get_segment_auto_share(segment_id, lightcast_attr)
-
-    segment_auto_shares.append({
-        'segment_id': segment_id,
-        'bea_auto_share': bea_share,
-        'lightcast_auto_share': lightcast_share
-    })
-
-auto_shares_df = pd.DataFrame(segment_auto_shares)
+def build_auto_shares():
+    segment_ids = pd.Index(sorted(mcda_2024['segment_id'].unique()), name='segment_id')
+    return pd.DataFrame({
+        'bea_auto_share': get_segment_auto_shares(bea_auto_share).reindex(segment_ids),
+        'lightcast_auto_share': get_segment_auto_shares(lightcast_auto_share).reindex(segment_ids),
+    }).reset_index()
+
+auto_shares_df = cached(
+    DATA_INTERIM / "segment_auto_shares.parquet",
+    [MCDA_PATH, SEGMENT_ASSIGNMENTS_PATH, BEA_ATTR_PATH, LIGHTCAST_ATTR_PATH, Path(__file__)],
+    build_auto_shares,
+)
 print(f"  - Computed auto shares for {len(auto_shares_df)} segments")
 
 # Merge auto shares with MCDA data
@@ -205,8 +256,6 @@ print(f"  - Original MCDA employment: {mcda_adjusted['employment'].sum():,.0f}")
 # ============================================================================
 print("\n[4/6] Generating occupation forecasts (2024-2034)...")
 
-all_occupation_forecasts = []
-
 # Process each methodology × attribution combination
 methodology_combinations = [
     ('BEA_Moody', 'bea', 'Moody'),
@@ -214,90 +263,106 @@ methodology_combinations = [
     ('Lightcast_Moody', 'lightcast', 'Moody'),
     ('Lightcast_BLS', 'lightcast', 'BLS'),
 ]
+forecast_key_dtype = pd.CategoricalDtype([key for key, _, _ in methodology_combinations], ordered=True)
 
-for forecast_key, attribution, growth_source in methodology_combinations:
-    print(f"\n  Processing: {forecast_key}")
-
+# One categorical dtype for occupation codes on both sides of the BLS merge
+occupation_code_dtype = pd.CategoricalDtype(
+    mcda_adjusted['occcd'].cat.categories.union(bls_segment_shifts['occupation_code'].cat.categories)
+)
+mcda_adjusted['occcd'] = mcda_adjusted['occcd'].astype(occupation_code_dtype)
+
+# BLS shares keyed by segment-occupation (one row per pair)
+bls_share_lookup = bls_segment_shifts[['segment_id', 'occupation_code', 'bls_share_2024', 'bls_share_2034']]
+bls_share_lookup = bls_share_lookup.astype({'occupation_code': occupation_code_dtype})
+bls_share_lookup = bls_share_lookup.drop_duplicates(subset=['segment_id', 'occupation_code'])
+
+def interpolate_occupation_employment(s24, s34, years, seg_emp, original_share):
+    """
+    Occupation employment = segment employment × share, where share is the BLS share linearly
+    interpolated 2024→2034 when s24 > 0, else the original MCDA share. Works in one buffer.
+    """
+    out = np.subtract(s34, s24)
+    out *= (years - 2024) / (2034 - 2024)
+    out += s24
+    np.copyto(out, original_share, where=~(s24 > 0))  # NaN s24 compares False -> fallback
+    out *= seg_emp
+    return out
+
+# Fallback: original MCDA share of the 2024 segment total, once per segment-occupation and methodology
+# (0 when the 2024 segment total is missing or zero)
+for forecast_key, attribution, _ in methodology_combinations:
     forecast_df = forecasts[forecast_key]
-    emp_col = f'employment_{attribution}'
-
-    # For each segment-occupation in MCDA
-    for idx, row in mcda_adjusted.iterrows():
-        segment_id = row['segment_id']
-        segment_name = row['segment']
-        occ_code = row['occcd']
-        occ_title = row['soctitle']
-        base_emp_2024 = row[emp_col]
-
-        # Get segment employment forecast
-        seg_forecast = forecast_df[forecast_df['segment_id'] == segment_id].copy()
-        seg_forecast = seg_forecast.sort_values('year')
-
-        # Get BLS occupational shift for this segment-occupation
-        bls_shift = bls_segment_shifts[
-            (bls_segment_shifts['segment_id'] == segment_id) &
-            (bls_segment_shifts['occupation_code'] == occ_code)
-        ]
-
-        if len(bls_shift) == 0:
-            # No BLS data for this occupation - use segment growth only
-            bls_share_2024 = None
-            bls_share_2034 = None
-        else:
-            bls_share_2024 = bls_shift.iloc[0]['bls_share_2024']
-            bls_share_2034 = bls_shift.iloc[0]['bls_share_2034']
-
-        # Generate forecast for each year
-        for year in range(2024, 2035):
-            year_forecast = seg_forecast[seg_forecast['year'] == year]
-
-            if len(year_forecast) == 0:
-                continue
-
-            segment_emp = year_forecast.iloc[0]['employment_qcew']
-
-            # Method: Apply both segment growth AND occupational shift
-            if bls_share_2024 is not None and bls_share_2024 > 0:
-                # Interpolate BLS share for this year
-                if year == 2024:
-                    bls_share_year = bls_share_2024
-                elif year == 2034:
-                    bls_share_year = bls_share_2034
-                else:
-                    # Linear interpolation
-                    years_elapsed = year - 2024
-                    total_years = 2034 - 2024
-                    bls_share_year = bls_share_2024 + (bls_share_2034 - bls_share_2024) * (years_elapsed / total_years)
-
-                # Occupation employment = segment employment × occupation share
-                occ_emp = segment_emp * bls_share_year
-            else:
-                # Fallback: maintain original share from MCDA
-                # Get 2024 segment employment
-                seg_2024 = seg_forecast[seg_forecast['year'] == 2024]
-                if len(seg_2024) > 0:
-                    segment_emp_2024 = seg_2024.iloc[0]['employment_qcew']
-                    original_share = base_emp_2024 / segment_emp_2024 if segment_emp_2024 > 0 else 0
-                    occ_emp = segment_emp * original_share
-                else:
-                    occ_emp = 0
-
-            all_occupation_forecasts.append({
-                'segment_id': segment_id,
-                'segment_name': segment_name,
-                'occupation_code': occ_code,
-                'occupation_title': occ_title,
-                'year': year,
-                'employment': occ_emp,
-                'attribution': attribution,
-                'growth_source': growth_source,
-                'methodology': f"{attribution}_{growth_source}",
-                'has_bls_shift': bls_share_2024 is not None
-            })
-
-    print(f"    - Generated {len([f for f in all_occupation_forecasts if f['methodology'] == f'{attribution}_{growth_source}'])} occupation-year forecasts")
-
-occupation_forecasts_df = pd.DataFrame(all_occupation_forecasts)
+    seg_emp_2024 = (
+        forecast_df[forecast_df['year'] == 2024]
+        .drop_duplicates(subset='segment_id')
+        .set_index('segment_id')['employment_qcew']
+    )
+    seg_2024 = mcda_adjusted['segment_id'].map(seg_emp_2024)
+    original_share = mcda_adjusted[f'employment_{attribution}'] / seg_2024
+    mcda_adjusted[f'original_share_{forecast_key}'] = original_share.where(seg_2024 > 0, 0.0)
+
+# All four segment forecasts stacked into one long frame keyed by forecast_key
+forecast_long = pd.concat(
+    [forecasts[key].assign(forecast_key=key) for key, _, _ in methodology_combinations],
+    ignore_index=True,
+)
+forecast_long['forecast_key'] = forecast_long['forecast_key'].astype(forecast_key_dtype)
+
+# Segment employment per methodology and year (first row per segment-year, as before)
+seg_years = (
+    forecast_long[['forecast_key', 'segment_id', 'year', 'employment_qcew']]
+    .drop_duplicates(subset=['forecast_key', 'segment_id', 'year'])
+    .rename(columns={'employment_qcew': 'segment_emp'})
+)
+
+# Segment-occupation rows × methodology, carrying the matching original-share fallback
+share_columns = {f'original_share_{key}': key for key, _, _ in methodology_combinations}
+occ_long = (
+    mcda_adjusted[['segment_id', 'segment', 'occcd', 'soctitle', *share_columns]]
+    .rename(columns={'segment': 'segment_name', 'occcd': 'occupation_code', 'soctitle': 'occupation_title'})
+    .melt(id_vars=['segment_id', 'segment_name', 'occupation_code', 'occupation_title'],
+          value_vars=list(share_columns), var_name='forecast_key', value_name='original_share')
+)
+occ_long['forecast_key'] = occ_long['forecast_key'].map(share_columns).astype(forecast_key_dtype)
+
+# Every segment-occupation × methodology × forecast year in one frame
+# (segment-years missing from a forecast drop out)
+grid = occ_long.merge(seg_years, on=['forecast_key', 'segment_id'], how='inner')
+grid = grid.merge(bls_share_lookup, on=['segment_id', 'occupation_code'], how='left')
+
+# Method: apply both segment growth AND occupational shift (linear interpolation of BLS share);
+# fallback: maintain original share from MCDA (precomputed above)
+s24 = grid['bls_share_2024'].to_numpy(dtype=float)
+has_bls_shift = ~np.isnan(s24)
+employment = interpolate_occupation_employment(
+    s24,
+    grid['bls_share_2034'].to_numpy(dtype=float),
+    grid['year'].to_numpy(dtype=float),
+    grid['segment_emp'].to_numpy(dtype=float),
+    grid['original_share'].to_numpy(dtype=float),
+)
+
+# attribution / growth_source / methodology derived from the forecast key (categorical map)
+attribution_by_key = {key: attribution for key, attribution, _ in methodology_combinations}
+growth_by_key = {key: growth_source for key, _, growth_source in methodology_combinations}
+methodology_by_key = {key: f"{attribution}_{growth_source}" for key, attribution, growth_source in methodology_combinations}
+
+# Assemble from typed column arrays (segment_id fits int8, year int16, employment float32)
+occupation_forecasts_df = pd.DataFrame({
+    'segment_id': grid['segment_id'].to_numpy(dtype=np.int8),
+    'segment_name': grid['segment_name'].array,
+    'occupation_code': grid['occupation_code'].array,
+    'occupation_title': grid['occupation_title'].array,
+    'year': grid['year'].to_numpy(dtype=np.int16),
+    'employment': employment.astype(np.float32),
+    'attribution': grid['forecast_key'].map(attribution_by_key).to_numpy(dtype=object),
+    'growth_source': grid['forecast_key'].map(growth_by_key).to_numpy(dtype=object),
+    'methodology': grid['forecast_key'].map(methodology_by_key).to_numpy(dtype=object),
+    'has_bls_shift': has_bls_shift,
+})
+
+for forecast_key, count in grid['forecast_key'].value_counts(sort=False).items():
+    print(f"  - {forecast_key}: {count} occupation-year forecasts")
 print(f"\n  Total occupation forecasts: {len(occupation_forecasts_df)}")
 
 # ============================================================================
@@ -305,31 +370,31 @@ print(f"\n  Total occupation forecasts: {len(occupation_forecasts_df)}")
 # ============================================================================
 print("\n[5/6] Saving outputs...")
 
-# Save comprehensive forecast file
-output_file = DATA_PROCESSED / "mi_occupation_employment_forecasts_2024_2034.csv"
-occupation_forecasts_df.to_csv(output_file, index=False)
+# Save comprehensive forecast file as one Parquet dataset partitioned by attribution and year
+# (read a slice with e.g. pd.read_parquet(path, filters=[('attribution', '=', 'bea')]))
+output_file = DATA_PROCESSED / "mi_occupation_forecasts.parquet"
+# Not tracked in git (see .gitignore); a previous run may have left a directory or a single file
+if output_file.is_dir():
+    shutil.rmtree(output_file)
+elif output_file.exists():
+    output_file.unlink()
+occupation_forecasts_df.to_parquet(output_file, partition_cols=['attribution', 'year'],
+                                   engine='pyarrow', compression='zstd', index=False)
 print(f"  - Saved: {output_file}")
 
-# Save 2030 snapshot
+# Save 2030 snapshot (CSV kept for spreadsheet users)
 forecast_2030 = occupation_forecasts_df[occupation_forecasts_df['year'] == 2030].copy()
 output_file_2030 = DATA_PROCESSED / "mi_occupation_employment_forecast_2030.csv"
 forecast_2030.to_csv(output_file_2030, index=False)
 print(f"  - Saved 2030 snapshot: {output_file_2030}")
 
-# Save separate files by attribution approach
-for attribution in ['bea', 'lightcast']:
-    attr_forecasts = occupation_forecasts_df[occupation_forecasts_df['attribution'] == attribution]
-    output_file_attr = DATA_PROCESSED / f"mi_occupation_employment_forecasts_{attribution}_2024_2034.csv"
-    attr_forecasts.to_csv(output_file_attr, index=False)
-    print(f"  - Saved {attribution.upper()} forecasts: {output_file_attr}")
-
 # ============================================================================
 # STEP 6: Generate summary statistics
 # ============================================================================
 print("\n[6/6] Summary statistics...")
 
 # 2030 employment by segment and methodology
-summary_2030 = forecast_2030.groupby(['segment_id', 'segment_name', 'methodology'])['employment'].sum().reset_index()
+summary_2030 = forecast_2030.groupby(['segment_id', 'segment_name', 'methodology'], observed=True)['employment'].sum().reset_index()
 summary_2030 = summary_2030.pivot(index=['segment_id', 'segment_name'],
                                    columns='methodology',
                                    values='employment').reset_index()
@@ -339,38 +404,33 @@ summary_2030.to_csv(output_summary, index=False)
 print(f"  - Saved 2030 segment summary: {output_summary}")
 
 # Top occupations by 2030 employment (across all methodologies)
-top_occupations = forecast_2030.groupby(['occupation_code', 'occupation_title'])['employment'].mean().reset_index()
+top_occupations = forecast_2030.groupby(['occupation_code', 'occupation_title'], observed=True)['employment'].mean().reset_index()
 top_occupations = top_occupations.sort_values('employment', ascending=False).head(20)
 print(f"\nTop 20 occupations by 2030 employment (avg across methodologies):")
-for idx, row in top_occupations.iterrows():
-    print(f"  {row['occupation_code']} - {row['occupation_title']}: {row['employment']:,.0f}")
+print(top_occupations.to_string(index=False, header=False,
+                                formatters={'employment': '{:,.0f}'.format}))
 
 # Segment totals for 2030
-segment_totals_2030 = forecast_2030.groupby(['segment_id', 'segment_name'])['employment'].mean().reset_index()
+segment_totals_2030 = forecast_2030.groupby(['segment_id', 'segment_name'], observed=True)['employment'].mean().reset_index()
 segment_totals_2030 = segment_totals_2030.sort_values('employment', ascending=False)
 print(f"\n2030 Employment by Segment (avg across methodologies):")
-for idx, row in segment_totals_2030.iterrows():
-    print(f"  Segment {row['segment_id']}: {row['employment']:,.0f}")
+print(segment_totals_2030[['segment_id', 'employment']].to_string(
+    index=False, header=False, formatters={'segment_id': 'Segment {}'.format, 'employment': '{:,.0f}'.format}))
 
 # VALIDATION: Check that occupation totals match segment totals
+METHODOLOGY_TO_FORECAST_KEY = {
+    'bea_Moody': 'BEA_Moody',
+    'bea_BLS': 'BEA_BLS',
+    'lightcast_Moody': 'Lightcast_Moody',
+    'lightcast_BLS': 'Lightcast_BLS',
+}
 print(f"\n=== VALIDATION: Occupation totals vs. Segment totals ===")
-for methodology in ['bea_Moody', 'bea_BLS', 'lightcast_Moody', 'lightcast_BLS']:
+for methodology in METHODOLOGY_TO_FORECAST_KEY:
     # Get occupation-aggregated totals
     occ_totals_2030 = forecast_2030[forecast_2030['methodology'] == methodology].groupby('segment_id')['employment'].sum()
 
-    # Get original segment forecast totals for 2030
-    if 'bea' in methodology:
-        if 'Moody' in methodology:
-            seg_forecast_file = 'mi_qcew_segment_employment_timeseries_bea_extended_moody.csv'
-        else:
-            seg_forecast_file = 'mi_qcew_segment_employment_timeseries_bea_extended_bls.csv'
-    else:
-        if 'Moody' in methodology:
-            seg_forecast_file = 'mi_qcew_segment_employment_timeseries_coreauto_extended_moody.csv'
-        else:
-            seg_forecast_file = 'mi_qcew_segment_employment_timeseries_coreauto_extended_bls.csv'
-
-    seg_forecast = pd.read_csv(DATA_PROCESSED / seg_forecast_file)
+    # Get original segment forecast totals for 2030 (already loaded in Step 1)
+    seg_forecast = forecasts[METHODOLOGY_TO_FORECAST_KEY[methodology]]
     seg_forecast_2030 = seg_forecast[seg_forecast['year'] == 2030]
 
     # Compare
@@ -1,7 +1,7 @@
 import pandas as pd
-from pathlib import Path
 
-RAW_PATH = Path("data/raw/Moody's Supply Chain Employment and Output 1970-2055.xlsx")
+from _moodys_io import add_metric_keys, load_moodys
+
 YEARS = (2024, 2030)
 METRIC_MAP = {
     "Employment": "employment",
@@ -11,18 +11,14 @@ METRIC_MAP = {
 }
 
 def load_data():
-    df = pd.read_excel(RAW_PATH)
-    df = df.assign(
-        metric=df['Description:'].str.split(':').str[0].str.strip(),
-        naics_code=df['Mnemonic:'].str.extract(r"(\d{4})").iloc[:, 0].str.zfill(4)
-    )
-    return df
+    columns = ['Geography:', 'Description:', 'Mnemonic:', *(pd.Timestamp(y, 12, 31) for y in YEARS)]
+    return add_metric_keys(load_moodys(columns))
 
 
 def compute_geography_table(df, geography):
-    subset = df[df['Geography:'] == geography].copy()
-    subset['metric_key'] = subset['metric'].map(METRIC_MAP)
-    subset = subset[subset['metric_key'].notna()]
+    metric_key = df['metric'].map(METRIC_MAP)
+    subset = df.loc[(df['Geography:'] == geography) & metric_key.notna()].copy()
+    subset['metric_key'] = metric_key
     subset[f'value_{YEARS[0]}'] = subset[pd.Timestamp(YEARS[0], 12, 31)]
     subset[f'value_{YEARS[1]}'] = subset[pd.Timestamp(YEARS[1], 12, 31)]
     base = subset[f'value_{YEARS[0]}']
@@ -30,11 +26,15 @@ def compute_geography_table(df, geography):
     subset['pct_change'] = (target - base) / base.replace({0: pd.NA}) * 100
     subset.loc[base == 0, 'pct_change'] = pd.NA
 
-    pivot_2024 = subset.pivot(index='naics_code', columns='metric_key', values=f'value_{YEARS[0]}').add_prefix(f'{YEARS[0]}_')
-    pivot_2030 = subset.pivot(index='naics_code', columns='metric_key', values=f'value_{YEARS[1]}').add_prefix(f'{YEARS[1]}_')
-    pivot_pct = subset.pivot(index='naics_code', columns='metric_key', values='pct_change').add_prefix(f'pct_change_{YEARS[0]}_{YEARS[1]}_')
-    result = pd.concat([pivot_2024, pivot_2030, pivot_pct], axis=1).reset_index()
-    return result
+    values = [f'value_{YEARS[0]}', f'value_{YEARS[1]}', 'pct_change']
+    wide = subset.pivot_table(index='naics_code', columns='metric_key', values=values,
+                              aggfunc='first', dropna=False)[values]
+    wide.columns = [
+        f'{value.removeprefix("value_")}_{metric}' if value.startswith('value_')
+        else f'{value}_{YEARS[0]}_{YEARS[1]}_{metric}'
+        for value, metric in wide.columns
+    ]
+    return wide.reset_index()
 
 
 df = load_data()
@@ -1,7 +1,7 @@
 import pandas as pd
-from pathlib import Path
 
-RAW_PATH = Path("data/raw/Moody's Supply Chain Employment and Output 1970-2055.xlsx")
+from _moodys_io import add_metric_keys, load_moodys
+
 YEARS = (2024, 2030)
 METRIC_MAP = {
     "Employment": "employment",
@@ -11,18 +11,14 @@ METRIC_MAP = {
 }
 
 def load_data():
-    df = pd.read_excel(RAW_PATH)
-    df = df.assign(
-        metric=df['Description:'].str.split(':').str[0].str.strip(),
-        naics_code=df['Mnemonic:'].str.extract(r"(\d{4})").iloc[:, 0].str.zfill(4)
-    )
-    return df
+    columns = ['Geography:', 'Description:', 'Mnemonic:', *(pd.Timestamp(y, 12, 31) for y in YEARS)]
+    return add_metric_keys(load_moodys(columns))
 
 
 def compute_geography_table(df, geography):
-    subset = df[df['Geography:'] == geography].copy()
-    subset['metric_key'] = subset['metric'].map(METRIC_MAP)
-    subset = subset[subset['metric_key'].notna()]
+    metric_key = df['metric'].map(METRIC_MAP)
+    subset = df.loc[(df['Geography:'] == geography) & metric_key.notna()].copy()
+    subset['metric_key'] = metric_key
     subset[f'value_{YEARS[0]}'] = subset[pd.Timestamp(YEARS[0], 12, 31)]
     subset[f'value_{YEARS[1]}'] = subset[pd.Timestamp(YEARS[1], 12, 31)]
     base = subset[f'value_{YEARS[0]}']
@@ -1,10 +1,8 @@
-import pandas as pd
-from pathlib import Path
+from _moodys_io import load_moodys
 
 
 def main():
-    path = Path("data/raw/Moody's Supply Chain Employment and Output 1970-2055.xlsx")
-    df = pd.read_excel(path)
+    df = load_moodys(['Geography:', 'Native Frequency:', 'Description:'])
     print('Unique geographies:', df['Geography:'].unique())
     print('Unique native frequencies:', df['Native Frequency:'].unique())
     print('Descriptions sample:', df['Description:'].head(10).tolist())
@@ -1,13 +1,22 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
+import posixpath
+import re
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Iterable, List, Set
+from xml.etree import ElementTree as ET
 import numpy as np
 import pandas as pd
+import requests
+from lxml import html as lxml_html
 from openpyxl import load_workbook
 LOOKUP_PATH = Path('data/lookups/segment_assignments.csv')
 MATRIX_WORKBOOK = Path('data/raw/occupation_2024_ep.xlsx')
 OUTPUT_DIR = Path('data/raw/us_staffing_patterns')
+DATASET_PATH = Path('data/raw/us_staffing_patterns.parquet')
 NAICS_LIST_PATH = Path('data/raw/us_staffing_patterns_naics.csv')
 MISSING_LOG_PATH = Path('data/raw/us_staffing_patterns_missing.csv')
 NUMERIC_COLUMNS = [
@@ -19,11 +28,24 @@ NUMERIC_COLUMNS = [
     'Projected 2034 Percent of Occupation',
     'Employment Change, 2024-2034',
     'Employment Percent Change, 2024-2034',
+    'Occupation Sort',
+    'Display Level',
 ]
 AGGREGATE_OVERRIDES: Dict[str, List[str]] = {
     '3270': ['3272'],
     '4840': ['4841', '4842'],
 }
+# Concurrent BLS downloads; submissions are spaced out to stay polite to the server
+MAX_WORKERS = 16
+SUBMIT_INTERVAL_SECONDS = 0.1
+REQUEST_TIMEOUT_SECONDS = 60
+# Table 1.9 NAICS cell parsing
+NON_DIGIT_RE = re.compile(r'\D')
+LONG_DASH_RE = re.compile('[\u2013\u2014]')
+# Same whitespace normalisation pd.read_html applies to cell text
+CELL_WHITESPACE_RE = re.compile(r'[\r\n]+|\s{2,}')
+OOXML_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+OOXML_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
 def get_target_naics() -> pd.Series:
     df = pd.read_csv(LOOKUP_PATH, dtype={'naics_code': str})
     codes = (df['naics_code']
@@ -32,84 +54,124 @@ def get_target_naics() -> pd.Series:
              .str.replace(r'[^0-9]', '', regex=True))
     codes = codes[codes.str.len() > 0].unique()
     return pd.Series(codes).sort_values().reset_index(drop=True)
-def expand_naics_codes(raw_value: object) -> Set[str]:
-    if raw_value is None:
-        return set()
-    s = str(raw_value).strip()
-    if not s or s == '?':
-        return set()
-    s = s.replace('\\u2013', '-').replace('\\u2014', '-').replace('\\uFFFD', '')
-    if '(' in s:
-        s = s.split('(')[0].strip()
-    codes: Set[str] = set()
-    if ',' in s:
-        parts = [part.strip() for part in s.split(',') if part.strip()]
-        if parts:
-            base_digits = ''.join(ch for ch in parts[0] if ch.isdigit())
-            if len(base_digits) >= 4:
-                codes.add(base_digits[:4])
-            prefix = base_digits[:-1] if len(base_digits) > 0 else ''
-            for part in parts[1:]:
-                digits = ''.join(ch for ch in part if ch.isdigit())
-                if len(digits) >= 4:
-                    codes.add(digits[:4])
-                elif prefix and digits:
-                    candidate = (prefix + digits)[-4:]
-                    if len(candidate) == 4:
-                        codes.add(candidate)
-        return codes
-    if '-' in s:
-        segments = [segment.strip() for segment in s.split('-') if segment.strip()]
-        for segment in segments:
-            digits = ''.join(ch for ch in segment if ch.isdigit())
-            if len(digits) >= 4:
-                codes.add(digits[:4])
-        if codes:
-            return codes
-    digits = ''.join(ch for ch in s if ch.isdigit())
-    if len(digits) >= 4:
-        codes.add(digits[:4])
-    return codes
+def expand_naics_column(values: pd.Series) -> pd.Series:
+    """4-digit NAICS codes for each cell of a Table 1.9 code column (Series of sets, same index)."""
+    s = values.reset_index(drop=True).astype('string').str.strip()
+    s = s.mask(s.eq('') | s.eq('?'))
+    s = (s.str.replace(LONG_DASH_RE, '-', regex=True)
+          .str.replace('\uFFFD', '', regex=False)
+          .str.split('(', n=1).str[0].str.strip())
+    has_comma = s.str.contains(',', regex=False, na=False)
+    has_dash = s.str.contains('-', regex=False, na=False) & ~has_comma
+    # Comma lists: full codes, or short suffixes completed with the first code's prefix ("3361, 2, 3")
+    parts = s[has_comma].str.split(',').explode().str.strip()
+    parts = parts[parts.ne('')]
+    part_digits = parts.str.replace(NON_DIGIT_RE, '', regex=True)
+    is_first = parts.groupby(level=0).cumcount().eq(0)
+    prefix = part_digits[is_first].str[:-1].reindex(part_digits.index)
+    suffixed = (prefix + part_digits).str[-4:]
+    comma_codes = part_digits.str[:4].where(part_digits.str.len() >= 4)
+    comma_codes = comma_codes.fillna(suffixed.where(~is_first & prefix.ne('') & part_digits.ne('')
+                                                     & suffixed.str.len().eq(4)))
+    # Ranges: each 4+-digit endpoint
+    segments = s[has_dash].str.split('-').explode().str.replace(NON_DIGIT_RE, '', regex=True)
+    dash_codes = segments.str[:4].where(segments.str.len() >= 4).dropna()
+    # Everything else (and ranges without a full endpoint): all digits in the cell
+    fallback = s.notna() & ~has_comma & ~s.index.isin(dash_codes.index)
+    digits = s[fallback].str.replace(NON_DIGIT_RE, '', regex=True)
+    fallback_codes = digits.str[:4].where(digits.str.len() >= 4)
+    codes = pd.concat([comma_codes, dash_codes, fallback_codes]).dropna()
+    grouped = codes.groupby(level=0).agg(set).reindex(s.index)
+    return pd.Series([c if isinstance(c, set) else set() for c in grouped], index=values.index)
+def read_sheet_hyperlinks(path: Path, sheet_name: str, cells: Set[str]) -> Dict[str, str]:
+    """External hyperlink targets for the given cell refs (e.g. 'E12'), read from the sheet XML."""
+    with zipfile.ZipFile(path) as zf:
+        workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+        sheet = next(el for el in workbook.iter(f'{OOXML_MAIN}sheet') if el.get('name') == sheet_name)
+        workbook_rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+        target = next(el.get('Target') for el in workbook_rels if el.get('Id') == sheet.get(f'{OOXML_REL}id'))
+        sheet_path = target.lstrip('/') if target.startswith('/') else posixpath.join('xl', target)
+        rels_path = posixpath.join(posixpath.dirname(sheet_path), '_rels', posixpath.basename(sheet_path) + '.rels')
+        sheet_rels = {el.get('Id'): el.get('Target') for el in ET.fromstring(zf.read(rels_path))}
+        links: Dict[str, str] = {}
+        with zf.open(sheet_path) as fh:
+            for _, el in ET.iterparse(fh):
+                if el.tag == f'{OOXML_MAIN}hyperlink':
+                    ref, rel_id = el.get('ref'), el.get(f'{OOXML_REL}id')
+                    if ref in cells and rel_id in sheet_rels:
+                        links[ref] = sheet_rels[rel_id]
+                elif el.tag == f'{OOXML_MAIN}row':
+                    el.clear()
+    return links
 def build_hyperlink_map(target_codes: Iterable[str]) -> Dict[str, str]:
-    wb = load_workbook(MATRIX_WORKBOOK, read_only=False, data_only=True)
-    ws = wb['Table 1.9']
     desired = set(str(code) for code in target_codes)
-    mapping: Dict[str, tuple[int, str]] = {}
-    for row in ws.iter_rows(min_row=3):
-        industry_type = (row[2].value or '').strip().lower()
-        hyperlink = row[4].hyperlink.target if row[4].hyperlink else None
-        if not hyperlink:
-            continue
-        codes = expand_naics_codes(row[3].value)
-        if not codes:
-            continue
-        priority = 0 if industry_type == 'summary' else 1
-        for code in codes:
-            if code in desired and (code not in mapping or priority < mapping[code][0]):
-                mapping[code] = (priority, hyperlink)
-            elif code in AGGREGATE_OVERRIDES:
-                for override in AGGREGATE_OVERRIDES[code]:
-                    if override in desired and (override not in mapping or priority < mapping[override][0]):
-                        mapping[override] = (priority + 1, hyperlink)
+    wanted = desired | {code for code, overrides in AGGREGATE_OVERRIDES.items() if desired.intersection(overrides)}
+    # Pass 1: stream cell values in read-only mode and keep only rows whose codes matter
+    wb = load_workbook(MATRIX_WORKBOOK, read_only=True, data_only=True)
+    ws = wb['Table 1.9']
+    row_numbers: List[int] = []
+    industry_types: List[str] = []
+    code_texts: List[object] = []
+    for row_idx, row in enumerate(ws.iter_rows(min_row=3, max_col=4, values_only=True), start=3):
+        row = row + (None,) * (4 - len(row))
+        row_numbers.append(row_idx)
+        industry_types.append((row[2] or '').strip().lower())
+        code_texts.append(row[3])
     wb.close()
-    return {code: link for code, (priority, link) in mapping.items()}
-def fetch_bls_table(code: str, url: str) -> pd.DataFrame:
-    tables = pd.read_html(url, header=0)
-    if not tables:
-        raise ValueError(f'No tables found for {code}')
-    df = tables[0]
+    codes_by_row = expand_naics_column(pd.Series(code_texts, dtype=object))
+    candidates: List[tuple[int, int, Set[str]]] = [
+        (row_idx, 0 if industry_type == 'summary' else 1, codes)
+        for row_idx, industry_type, codes in zip(row_numbers, industry_types, codes_by_row)
+        if codes & wanted
+    ]
+    # Pass 2: hyperlinks (column E) for the matched rows only
+    links = read_sheet_hyperlinks(MATRIX_WORKBOOK, 'Table 1.9', {f'E{row_idx}' for row_idx, _, _ in candidates})
+    hits = pd.DataFrame(candidates, columns=['row_idx', 'priority', 'code'])
+    hits['hyperlink'] = [links.get(f'E{row_idx}') for row_idx in hits['row_idx']]
+    hits = hits.dropna(subset=['hyperlink']).explode('code')
+    # Codes we want directly; otherwise aggregates stand in for their components one priority lower
+    is_direct = hits['code'].isin(desired)
+    direct = hits[is_direct]
+    overrides = hits[~is_direct & hits['code'].isin(AGGREGATE_OVERRIDES.keys())]
+    overrides = overrides.assign(code=overrides['code'].map(AGGREGATE_OVERRIDES),
+                                 priority=overrides['priority'] + 1).explode('code')
+    overrides = overrides[overrides['code'].isin(desired)]
+    # Lowest priority wins; ties go to the earliest row
+    ranked = (pd.concat([direct, overrides])
+              .sort_index(kind='stable')
+              .sort_values('priority', kind='stable'))
+    return ranked.groupby('code')['hyperlink'].first().to_dict()
+def parse_first_table(page: str) -> pd.DataFrame:
+    """First <table> of an HTML page as a DataFrame of strings (first row = header, colspans repeated)."""
+    table = lxml_html.fromstring(page).find('.//table')
+    if table is None:
+        raise ValueError('No tables found')
+    rows: List[List[str]] = []
+    for tr in table.iter('tr'):
+        row: List[str] = []
+        for cell in tr.xpath('./th|./td'):
+            text = CELL_WHITESPACE_RE.sub(' ', cell.text_content()).strip()
+            row.extend([text] * int(cell.get('colspan', 1)))
+        rows.append(row)
+    if not rows:
+        raise ValueError('Empty table')
+    return pd.DataFrame(rows[1:], columns=rows[0])
+def fetch_bls_table(code: str, url: str, session: requests.Session) -> pd.DataFrame:
+    response = session.get(url, timeout=REQUEST_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    try:
+        df = parse_first_table(response.text)
+    except ValueError as exc:
+        raise ValueError(f'{exc} for {code}') from exc
     df = df[df['Occupation Title'] != 'Filter by Title:'].copy()
     if df.empty:
         raise ValueError(f'Empty table for {code}')
     df.insert(0, 'naics_code', code)
     df['source_url'] = url
-    for col in NUMERIC_COLUMNS:
-        if col in df.columns:
-            df[col] = (df[col]
-                       .astype(str)
-                       .str.replace(',', '', regex=False)
-                       .str.replace('%', '', regex=False))
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+    num_cols = [col for col in NUMERIC_COLUMNS if col in df.columns]
+    df[num_cols] = (df[num_cols]
+                    .replace(r'[,%]', '', regex=True)
+                    .apply(pd.to_numeric, errors='coerce'))
     return df
 def main() -> None:
     codes = get_target_naics()
@@ -118,19 +180,41 @@ def main() -> None:
     link_map = build_hyperlink_map(codes)
     missing_links: List[str] = []
     failures: List[Dict[str, str]] = []
+    jobs: Dict[str, str] = {}
+    frames: List[pd.DataFrame] = []
     for code in codes:
         code_str = str(code)
         url = link_map.get(code_str)
         if not url:
             missing_links.append(code_str)
             continue
-        try:
-            df = fetch_bls_table(code_str, url)
-        except Exception as exc:  # noqa: BLE001
-            failures.append({'naics_code': code_str, 'source_url': url, 'error': str(exc)})
-            continue
-        out_path = OUTPUT_DIR / f'us_staffing_{code_str}.csv'
-        df.to_csv(out_path, index=False)
+        jobs[code_str] = url
+    # One keep-alive connection pool shared by all worker threads
+    with requests.Session() as session:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {}
+            for code_str, url in jobs.items():
+                futures[executor.submit(fetch_bls_table, code_str, url, session)] = code_str
+                time.sleep(SUBMIT_INTERVAL_SECONDS)
+            for future in as_completed(futures):
+                code_str = futures[future]
+                try:
+                    df = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    failures.append({'naics_code': code_str, 'source_url': jobs[code_str], 'error': str(exc)})
+                    continue
+                out_path = OUTPUT_DIR / f'us_staffing_{code_str}.csv'
+                df.to_csv(out_path, index=False)
+                frames.append(df)
+    failures.sort(key=lambda record: record['naics_code'])
+    if frames:
+        # All fetched tables as one typed dataset; only the re-fetched NAICS partitions are replaced
+        combined = pd.concat(frames, ignore_index=True).sort_values('naics_code', kind='stable')
+        combined.to_parquet(DATASET_PATH, engine='pyarrow', compression='zstd', index=False,
+                            partition_cols=['naics_code'], existing_data_behavior='delete_matching')
     if missing_links or failures:
         records: List[Dict[str, str]] = []
         records.extend({'naics_code': code, 'issue': 'missing_link'} for code in missing_links)
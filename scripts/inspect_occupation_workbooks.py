@@ -1,7 +1,12 @@
-import pandas as pd
+import zipfile
 from pathlib import Path
+from xml.etree import ElementTree as ET
+
+# Sheet names live in xl/workbook.xml; no need to parse the workbook itself
+SHEET_TAG = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet'
 
 for year in (2023, 2024):
     path = Path(f"data/raw/occupation_{year}_ep.xlsx")
-    xls = pd.ExcelFile(path)
-    print(year, xls.sheet_names)
+    with zipfile.ZipFile(path) as zf:
+        workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    print(year, [sheet.get('name') for sheet in workbook.iter(SHEET_TAG)])
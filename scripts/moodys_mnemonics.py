@@ -1,10 +1,8 @@
-import pandas as pd
-from pathlib import Path
+from _moodys_io import load_moodys
 
 
 def main():
-    path = Path("data/raw/Moody's Supply Chain Employment and Output 1970-2055.xlsx")
-    df = pd.read_excel(path)
+    df = load_moodys(['Mnemonic:', 'Geography:', 'Description:'])
     df['metric'] = df['Description:'].str.split(':').str[0]
     for metric in sorted(df['metric'].unique()):
         subset = df[df['metric'] == metric].head(5)
@@ -8,6 +8,8 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 
+from _csv_io import write_csv, write_parquet
+
 SEGMENT_LABELS = {
     1: "1. Materials & Processing",
     2: "2. Equipment Manufacturing",
@@ -24,7 +26,7 @@ SEGMENT_LABELS = {
 
 def normalize_segment_totals(path: Path) -> pd.DataFrame:
     """Normalize segment totals compare file to long format."""
-    df = pd.read_csv(path)
+    df = pd.read_csv(path, engine="pyarrow")
 
     required = {"segment_id", "segment_name", "year", "employment_qcew"}
     if not required.issubset(df.columns):
@@ -34,12 +36,13 @@ def normalize_segment_totals(path: Path) -> pd.DataFrame:
     df["segment_id"] = pd.to_numeric(df["segment_id"], errors="coerce").astype("Int64")
     df["segment_name"] = df["segment_name"].astype(str).str.strip()
     df["year"] = pd.to_numeric(df["year"], errors="coerce").astype(int)
-    df["employment_qcew"] = pd.to_numeric(df["employment_qcew"], errors="coerce")
+    df["employment_qcew"] = pd.to_numeric(df["employment_qcew"], errors="coerce").astype(np.float32)
 
-    df["adjustment_source"] = df.get("adjustment_source", "").astype(str).str.strip().str.lower()
-    df["forecast_source"] = df.get("forecast_source", "").astype(str).str.strip().str.lower()
-    df.loc[df["forecast_source"] == "", "forecast_source"] = "qcew"
-    df.loc[df["adjustment_source"] == "", "adjustment_source"] = "unadjusted"
+    # Blank or missing sources fall back to the defaults
+    for col, default in (("adjustment_source", "unadjusted"), ("forecast_source", "qcew")):
+        values = df[col] if col in df.columns else pd.Series(pd.NA, index=df.index)
+        values = values.astype("string").fillna("").str.strip().str.lower()
+        df[col] = values.mask(values == "", default)
 
     df["methodology"] = df["adjustment_source"] + "_" + df["forecast_source"]
     df["methodology"] = df["methodology"].str.replace("__", "_", regex=False)
@@ -52,7 +55,7 @@ def normalize_segment_totals(path: Path) -> pd.DataFrame:
 
 
 def expand_base_year_methods(segment_totals: pd.DataFrame) -> pd.DataFrame:
-    """Duplicate base-year rows across forecast methodologies."""
+    """Duplicate base-year rows across forecast methodologies (rows come back unsorted)."""
     if segment_totals.empty:
         return segment_totals
 
@@ -64,60 +67,73 @@ def expand_base_year_methods(segment_totals: pd.DataFrame) -> pd.DataFrame:
         .unique()
     )
 
-    prefix_map: dict[str, set[str]] = {}
-    for method in future_methods:
-        method_str = str(method)
-        if not method_str:
-            continue
-        prefix = method_str.split("_")[0]
-        prefix_map.setdefault(prefix, set()).add(method_str)
+    # Future methodologies keyed by their prefix (e.g. "bea" -> bea_moody, bea_bls)
+    prefix_df = pd.DataFrame({"target_methodology": pd.Series(future_methods, dtype=str)})
+    prefix_df = prefix_df[prefix_df["target_methodology"] != ""]
+    prefix_df["prefix"] = prefix_df["target_methodology"].str.split("_").str[0]
+    prefix_df = prefix_df.drop_duplicates().sort_values(["prefix", "target_methodology"])
 
     base_rows = segment_totals[segment_totals["year"] == base_year].copy()
     if base_rows.empty:
         return segment_totals
 
-    expanded_rows: list[pd.Series] = []
-    for _, row in base_rows.iterrows():
-        method_str = str(row["methodology"])
-        prefix = method_str.split("_")[0]
-        target_methods = sorted(prefix_map.get(prefix, []))
-        if not target_methods:
-            target_methods = [method_str]
-        for target_method in target_methods:
-            new_row = row.copy()
-            new_row["methodology"] = target_method
-            expanded_rows.append(new_row)
-
-    if not expanded_rows:
+    # Fast path: every base methodology maps only onto itself (or onto nothing), so nothing to expand
+    targets = prefix_df.groupby("prefix")["target_methodology"].agg(frozenset)
+    base_methods = pd.Series(base_rows["methodology"].astype(str).unique())
+    base_targets = base_methods.str.split("_").str[0].map(targets)
+    if all(pd.isna(t) or t == {m} for m, t in zip(base_methods, base_targets)):
         return segment_totals
 
-    expanded_df = pd.DataFrame(expanded_rows)
+    # One merge fans each base row out to every methodology sharing its prefix;
+    # rows whose prefix has no future methodology keep their own
+    base_rows["prefix"] = base_rows["methodology"].astype(str).str.split("_").str[0]
+    expanded_df = base_rows.merge(prefix_df, on="prefix", how="left")
+    expanded_df["methodology"] = expanded_df["target_methodology"].fillna(expanded_df["methodology"])
+    expanded_df = expanded_df.drop(columns=["prefix", "target_methodology"])
+
     remainder = segment_totals[segment_totals["year"] > base_year]
-    combined = pd.concat([expanded_df, remainder], ignore_index=True)
-    combined = combined.sort_values(["segment_id", "year", "methodology"]).reset_index(drop=True)
-    return combined
+    return pd.concat([expanded_df, remainder], ignore_index=True)
 
 
 
-def load_mcda_shares(path: Path) -> pd.DataFrame:
-    df = pd.read_csv(path)
+MCDA_SHARE_COLUMNS = {
+    "segment_id", "segment", "year", "occ_level", "occcd", "soctitle",
+    "pct_seg_detailed_2024", "empl_2024",
+    "ep_entry_education", "ep_work_experience", "ep_on_the_job_training", "ep_edu_grouped",
+}
+# Shares and employment travel as float32 (the inputs carry no more than ~6 significant digits);
+# the forecast broadcast is the largest frame in the pipeline, so this halves its numeric bytes
+MCDA_SHARE_DTYPES = {"segment_id": "Int64", "pct_seg_detailed_2024": "float32", "empl_2024": "float32"}
+US_SHARE_DTYPES = {
+    "segment_id": "Int64",
+    "Occupation Code": "string",
+    "segment_share_2024": "float32",
+    "segment_share_2034": "float32",
+}
+
 
-    if "segment_id" in df.columns:
-        df["segment_id"] = pd.to_numeric(df["segment_id"], errors="coerce").astype("Int64")
-    elif "segment" in df.columns:
+def load_mcda_shares(path: Path) -> pd.DataFrame:
+    # Only the columns used below (the staffing file carries ~25), numeric ones typed up front.
+    # The pyarrow engine wants an explicit column list, so resolve it from the header first.
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [col for col in header if col in MCDA_SHARE_COLUMNS]
+    dtype = {col: kind for col, kind in MCDA_SHARE_DTYPES.items() if col in usecols}
+    df = pd.read_csv(path, usecols=usecols, dtype=dtype, engine="pyarrow")
+
+    # segment_id, when present, is already Int64 via MCDA_SHARE_DTYPES
+    if "segment_id" not in df.columns:
+        if "segment" not in df.columns:
+            raise ValueError("MCDA staffing file must include either 'segment_id' or 'segment'.")
         df["segment_id"] = (
             df["segment"].astype(str).str.extract(r"^(\d+)")[0].astype(float).astype("Int64")
         )
-    else:
-        raise ValueError("MCDA staffing file must include either 'segment_id' or 'segment'.")
-
-    df["segment_name"] = df.get("segment", df["segment_id"].map(SEGMENT_LABELS))
-    df["segment_name"] = df["segment_name"].astype(str).str.strip()
 
+    keep = pd.Series(True, index=df.index)
     if "occ_level" in df.columns:
-        df = df[df["occ_level"].str.lower() == "detailed"].copy()
+        keep &= df["occ_level"].str.lower() == "detailed"
     if "year" in df.columns:
-        df = df[df["year"] == 2024].copy()
+        keep &= df["year"] == 2024
+    df = df[keep].copy()
 
     if "pct_seg_detailed_2024" in df.columns:
         df["share_2024"] = pd.to_numeric(df["pct_seg_detailed_2024"], errors="coerce")
@@ -129,6 +145,9 @@ def load_mcda_shares(path: Path) -> pd.DataFrame:
         df["share_2024"] = np.where(totals > 0, df["empl_2024"] / totals, np.nan)
 
     df = df[df["share_2024"].notna()].copy()
+    # String cleanup once, on the rows that survive the filters
+    segment_name = df["segment"] if "segment" in df.columns else df["segment_id"].map(SEGMENT_LABELS)
+    df["segment_name"] = segment_name.astype(str).str.strip()
     df["occcd"] = df["occcd"].astype(str).str.strip()
 
     keep_cols = [
@@ -149,7 +168,7 @@ def load_mcda_shares(path: Path) -> pd.DataFrame:
 
 
 def load_us_shares(path: Path) -> pd.DataFrame:
-    df = pd.read_csv(path)
+    df = pd.read_csv(path, usecols=list(US_SHARE_DTYPES), dtype=US_SHARE_DTYPES, engine="pyarrow")
     df["segment_id"] = pd.to_numeric(df["segment_id"], errors="coerce").astype("Int64")
     df["Occupation Code"] = df["Occupation Code"].astype(str).str.strip()
     df = df[~df["Occupation Code"].str.endswith("-0000")].copy()
@@ -197,8 +216,8 @@ def interpolate_shares(base: pd.DataFrame, target: Optional[pd.DataFrame], years
     shares["target_share"] = shares["target_share_raw"] / target_totals
     shares["target_share"] = shares["target_share"].replace([np.inf, -np.inf], np.nan).fillna(shares["base_share"])
     shares = shares.drop(columns=["target_share_raw"])
+    shares[["base_share", "target_share"]] = shares[["base_share", "target_share"]].astype(np.float32)
 
-    results = []
     result_cols = [
         "segment_id",
         "segment_name",
@@ -214,64 +233,64 @@ def interpolate_shares(base: pd.DataFrame, target: Optional[pd.DataFrame], years
         "ep_edu_grouped",
     ]
 
-    for year in years:
-        if year <= 2024:
-            progress = 0.0
-        elif year >= 2034:
-            progress = 1.0
-        else:
-            progress = (year - 2024) / (2034 - 2024)
-
-        temp = shares.copy()
-        temp["share"] = temp["base_share"] * (1 + (temp["growth_factor"] - 1) * progress)
-        totals = temp.groupby("segment_id")["share"].transform("sum")
-        temp["share"] = temp["share"] / totals
-        temp["share"] = temp["share"].replace([np.inf, -np.inf], np.nan).fillna(temp["base_share"])
-
-        temp["year"] = int(year)
-        temp["share_2024"] = temp["base_share"]
-        temp["share_2034"] = temp["target_share"]
-
-        results.append(temp[result_cols])
-
-    if not results:
+    if len(years) == 0:
         return pd.DataFrame(columns=result_cols)
 
-    return pd.concat(results, ignore_index=True)
+    # All years at once: rows of the (year × occupation) arrays are years
+    year_arr = np.asarray(years, dtype=int)
+    progress = np.clip((year_arr - 2024) / (2034 - 2024), 0.0, 1.0)
+    base = shares["base_share"].to_numpy(dtype=float)
+    growth_minus_1 = shares["growth_factor"].to_numpy(dtype=float) - 1
+    raw = base * (1 + growth_minus_1 * progress[:, None])
+
+    # Per-year segment sums via one bincount over (year, segment) cells; rows without a segment get NaN
+    seg_idx, seg_ids = pd.factorize(shares["segment_id"])
+    has_seg = seg_idx >= 0
+    n_years, n_segs = len(year_arr), len(seg_ids)
+    cell = np.arange(n_years)[:, None] * n_segs + seg_idx
+    seg_sums = np.bincount(cell[:, has_seg].ravel(), weights=raw[:, has_seg].ravel(),
+                           minlength=n_years * n_segs).reshape(n_years, n_segs)
+    totals = np.where(has_seg, seg_sums[:, np.where(has_seg, seg_idx, 0)], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = raw / totals
+    share = np.where(np.isfinite(share), share, base)
+
+    # Build the output from column arrays: per-occupation columns tiled once per year
+    tile = np.tile(np.arange(len(shares)), n_years)
+    columns = {}
+    for col in result_cols:
+        if col == "year":
+            columns[col] = np.repeat(year_arr, len(shares))
+        elif col == "share":
+            columns[col] = share.ravel().astype(np.float32)
+        else:
+            source = {"share_2024": "base_share", "share_2034": "target_share"}.get(col, col)
+            columns[col] = shares[source].array.take(tile)
+    return pd.DataFrame(columns)
 
 
 def build_forecasts(segment_totals: pd.DataFrame, share_df: pd.DataFrame) -> pd.DataFrame:
-    totals = segment_totals.set_index(["segment_id", "year", "methodology"])  # type: ignore[arg-type]
-    records = []
-    methodologies = segment_totals["methodology"].unique()
-
-    for _, row in share_df.iterrows():
-        seg_id = row["segment_id"]
-        year = row["year"]
-        share = row["share"]
-        for method in methodologies:
-            key = (seg_id, year, method)
-            if key not in totals.index:
-                continue
-            total = totals.loc[key, "employment_qcew"]
-            employment = total * share
-            records.append({
-                "segment_id": seg_id,
-                "segment_name": row["segment_name"],
-                "year": year,
-                "methodology": method,
-                "occcd": row["occcd"],
-                "soctitle": row["soctitle"],
-                "employment": employment,
-                "share": share,
-                "share_2024": row["share_2024"],
-                "share_2034": row["share_2034"],
-                "ep_entry_education": row["ep_entry_education"],
-                "ep_work_experience": row["ep_work_experience"],
-                "ep_on_the_job_training": row["ep_on_the_job_training"],
-                "ep_edu_grouped": row["ep_edu_grouped"],
-            })
-    return pd.DataFrame(records)
+    """Occupation employment = segment total × occupation share, for every methodology with a total."""
+    totals = segment_totals[["segment_id", "year", "methodology", "employment_qcew"]]
+    # Inner merge broadcasts each share row across the methodologies present for its segment-year
+    result = share_df.merge(totals, on=["segment_id", "year"], how="inner")
+    result["employment"] = result["employment_qcew"] * result["share"]
+    return result[[
+        "segment_id",
+        "segment_name",
+        "year",
+        "methodology",
+        "occcd",
+        "soctitle",
+        "employment",
+        "share",
+        "share_2024",
+        "share_2034",
+        "ep_entry_education",
+        "ep_work_experience",
+        "ep_on_the_job_training",
+        "ep_edu_grouped",
+    ]]
 
 
 def main() -> None:
@@ -295,6 +314,12 @@ def main() -> None:
     share_df = interpolate_shares(mcda, us_shares, years)
 
     forecasts = build_forecasts(segment_totals, share_df)
+    # Low-cardinality join keys as shared categoricals (sorted categories keep the output sort order)
+    key_dtypes = {
+        "methodology": pd.CategoricalDtype(sorted(forecasts["methodology"].unique())),
+        "occcd": pd.CategoricalDtype(sorted(forecasts["occcd"].unique())),
+    }
+    forecasts = forecasts.astype(key_dtypes)
 
     # Append aggregated totals across all segments as segment 0
     segment_meta_cols = [
@@ -307,15 +332,15 @@ def main() -> None:
         "ep_on_the_job_training",
         "ep_edu_grouped",
     ]
-    aggregated = forecasts.groupby(segment_meta_cols, as_index=False)["employment"].sum()
+    aggregated = forecasts.groupby(segment_meta_cols, as_index=False, observed=True)["employment"].sum()
     aggregated["segment_id"] = 0
     aggregated["segment_name"] = "0. All Segments"
 
-    year_group_totals = aggregated.groupby(["methodology", "year"])["employment"].transform("sum")
+    year_group_totals = aggregated.groupby(["methodology", "year"], observed=True)["employment"].transform("sum")
     aggregated["share"] = np.where(year_group_totals > 0, aggregated["employment"] / year_group_totals, np.nan)
 
     share_lookup = forecasts[["methodology", "occcd", "share_2024", "share_2034"]].drop_duplicates(subset=["methodology", "occcd"])
-    aggregated = aggregated.merge(share_lookup, on=["methodology", "occcd"], how="left")
+    aggregated = aggregated.merge(share_lookup.astype(key_dtypes), on=["methodology", "occcd"], how="left")
 
     aggregated = aggregated[[
         "segment_id",
@@ -341,21 +366,24 @@ def main() -> None:
     out_dir.mkdir(parents=True, exist_ok=True)
 
     full_path = out_dir / f"{args.out_prefix}_2024_2034.csv"
-    forecasts.to_csv(full_path, index=False)
+    write_csv(forecasts, full_path)
+    # Columnar copy (keeps the categorical keys) for the dashboards and other repeat readers
+    write_parquet(forecasts, full_path.with_suffix(".parquet"))
 
-    snap_2030 = forecasts[forecasts["year"] == 2030].copy()
     snap_path = out_dir / f"{args.out_prefix}_2030.csv"
-    snap_2030.to_csv(snap_path, index=False)
+    write_csv(forecasts[forecasts["year"].to_numpy() == 2030], snap_path)
 
-    occ_totals = forecasts.groupby(["segment_id", "year", "methodology"], as_index=False)["employment"].sum()
+    occ_totals = forecasts.groupby(["segment_id", "year", "methodology"], as_index=False, observed=True)["employment"].sum()
     validation = occ_totals.merge(segment_totals, on=["segment_id", "year", "methodology"], how="left")
-    validation["pct_diff"] = np.where(
-        validation["employment_qcew"] > 0,
-        (validation["employment"] - validation["employment_qcew"]) / validation["employment_qcew"] * 100,
-        np.nan,
-    )
+    # Divide only where the QCEW total is positive; everything else stays NaN
+    employment = validation["employment"].to_numpy(dtype=np.float32)
+    qcew = validation["employment_qcew"].to_numpy(dtype=np.float32)
+    pct_diff = np.full(employment.shape, np.nan, dtype=np.float32)
+    np.divide(employment - qcew, qcew, out=pct_diff, where=qcew > 0)
+    pct_diff *= 100
+    validation["pct_diff"] = pct_diff
     val_path = out_dir / f"{args.out_prefix}_validation.csv"
-    validation.to_csv(val_path, index=False)
+    write_csv(validation, val_path)
 
     print("Saved forecasts:", full_path)
     print("Saved 2030 snapshot:", snap_path)
@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Tuple
 
 import numpy as np
 import pandas as pd
 
+from _csv_io import write_csv
+from _excel_io import EXCEL_ENGINE, EXCEL_WRITER_ENGINE
+
 RAW_STAFFING = Path('data/raw/Staffing Patterns for 10 Categories.xlsx')
 RAW_EP = Path('data/raw/occupation_2024_ep.xlsx')
 
@@ -21,6 +26,29 @@ PROCESSED_LONG_XLSX = Path('data/processed/mcda_staffing_long_2021_2024.xlsx')
 YEARS = (2021, 2024)
 
 
+# Typical entry-level education (EP Table 1.2) -> education group; anything else maps to NaN
+EDU_GROUPS = {
+    'No formal educational credential': 'HS or less',
+    'High school diploma or equivalent': 'HS or less',
+    'Postsecondary nondegree award': "SC or associate's",
+    "Associate's degree": "SC or associate's",
+    'Some college, no degree': "SC or associate's",
+    "Bachelor's degree": 'BA+',
+    "Master's degree": 'BA+',
+    'Doctoral or professional degree': 'BA+',
+}
+
+# Checked in order; the first matching level wins
+OCC_LEVEL_PATTERNS = {
+    'major': re.compile(r"\d{2}-?0000"),
+    'broad': re.compile(r"\d{2}-\d{2}00(?:\.\d{2})?|\d{4}00"),
+    'detailed': re.compile(r"\d{2}-\d{4}(?:\.\d{2})?|\d{6}"),
+}
+
+# "All occupations" total rows (the only code seen in the staffing sheets is 00-0000)
+TOTAL_CODES = frozenset({'00-0000', '000000'})
+
+
 def sanitize_sheet_name(name: str) -> str:
     """Excel-safe sheet names."""
     cleaned = re.sub(r"[\\[\\]\\*\\?/\\\\]", " ", name)
@@ -28,26 +56,29 @@ def sanitize_sheet_name(name: str) -> str:
     return cleaned[:31] if len(cleaned) > 31 else cleaned
 
 
-def classify_occ_level(code: str) -> str:
-    if not isinstance(code, str):
-        return 'unknown'
-    code = code.strip()
-    if not code:
-        return 'unknown'
-    if re.match(r"^\d{2}-?0000$", code):
-        return 'major'
-    if re.match(r"^\d{2}-\d{2}00(?:\.\d{2})?$", code) or re.match(r"^\d{4}00$", code):
-        return 'broad'
-    if re.match(r"^\d{2}-\d{4}(?:\.\d{2})?$", code) or re.match(r"^\d{6}$", code):
-        return 'detailed'
-    return 'unknown'
+def classify_occ_levels(codes: pd.Series) -> np.ndarray:
+    """Vectorized SOC level (major/broad/detailed/unknown) for a column of codes."""
+    codes = codes.astype(str).str.strip()
+    conditions = [
+        codes.str.fullmatch(pattern).fillna(False).to_numpy(dtype=bool)
+        for pattern in OCC_LEVEL_PATTERNS.values()
+    ]
+    return np.select(conditions, list(OCC_LEVEL_PATTERNS), default='unknown')
+
+
+def _read_staffing_sheet(sheet: str) -> pd.DataFrame:
+    # Runs in a worker process, so it opens the workbook itself
+    return pd.read_excel(RAW_STAFFING, sheet_name=sheet, engine=EXCEL_ENGINE)
 
 
 def load_staffing() -> pd.DataFrame:
-    xls = pd.ExcelFile(RAW_STAFFING)
+    with pd.ExcelFile(RAW_STAFFING, engine=EXCEL_ENGINE) as xls:
+        sheets = xls.sheet_names
+    # Sheets are independent and parsing is CPU-bound, so read them in parallel
+    with ProcessPoolExecutor(max_workers=max(1, min(len(sheets), os.cpu_count() or 1))) as pool:
+        sheet_frames = list(pool.map(_read_staffing_sheet, sheets))
     frames: List[pd.DataFrame] = []
-    for sheet in xls.sheet_names:
-        df = pd.read_excel(xls, sheet_name=sheet)
+    for sheet, df in zip(sheets, sheet_frames):
         if df.empty:
             continue
         df.columns = [str(c).strip().lower().replace(' ', '_') for c in df.columns]
@@ -58,8 +89,7 @@ def load_staffing() -> pd.DataFrame:
         for col in subset_cols:
             if col not in df.columns:
                 df[col] = np.nan
-        df = df[subset_cols]
-        df['segment'] = sheet
+        df = df[subset_cols].assign(segment=sheet)
         frames.append(df)
     if not frames:
         raise RuntimeError('No staffing sheets loaded')
@@ -71,13 +101,16 @@ def load_staffing() -> pd.DataFrame:
     combined = combined.dropna(subset=['occcd', 'estyear'])
     combined = combined[combined['estyear'].isin(YEARS)]
     combined = combined.replace({'soctitle': {'nan': np.nan}})
+    # Low-cardinality group key as a categorical (sorted categories keep the output order)
+    combined['segment'] = combined['segment'].astype('category')
     return combined
 
 
 def pivot_staffing(df: pd.DataFrame) -> pd.DataFrame:
     pivot = (
         df
-        .pivot_table(index=['segment', 'occcd', 'soctitle'], columns='estyear', values='roundempl', aggfunc='sum')
+        .pivot_table(index=['segment', 'occcd', 'soctitle'], columns='estyear', values='roundempl', aggfunc='sum',
+                     observed=True)
         .reset_index()
     )
     rename_map = {year: f'empl_{year}' for year in YEARS}
@@ -86,37 +119,24 @@ def pivot_staffing(df: pd.DataFrame) -> pd.DataFrame:
         col = f'empl_{year}'
         if col not in pivot:
             pivot[col] = np.nan
-    pivot['occ_level'] = pivot['occcd'].apply(classify_occ_level)
-    pivot['is_total_all'] = pivot['occcd'].str.replace(r'\D', '', regex=True).eq('000000')
+    pivot['occ_level'] = classify_occ_levels(pivot['occcd'])
+    pivot['is_total_all'] = pivot['occcd'].isin(TOTAL_CODES)
     return pivot
 
 
 def compute_segment_shares(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
+    empl_cols = [f'empl_{year}' for year in YEARS]
+    # Shares are taken within segment among major rows (less the all-occupation total) or detailed rows;
+    # one groupby over (segment, level) gives the denominators for every year at once
+    share_level = df['occ_level'].where(
+        ((df['occ_level'] == 'major') & ~df['is_total_all']) | (df['occ_level'] == 'detailed')
+    )
+    totals = df.groupby([df['segment'], share_level], observed=True)[empl_cols].transform('sum')
+    shares = (df[empl_cols] / totals).where(totals > 0)
     for year in YEARS:
-        col = f'empl_{year}'
-        # Major share
-        mask_major = (df['occ_level'] == 'major') & (~df['is_total_all'])
-        if mask_major.any():
-            totals_major = df.loc[mask_major].groupby('segment')[col].transform('sum')
-            df.loc[mask_major, f'pct_seg_major_{year}'] = np.where(
-                totals_major > 0,
-                df.loc[mask_major, col] / totals_major,
-                np.nan
-            )
-        else:
-            df[f'pct_seg_major_{year}'] = np.nan
-        # Detailed share
-        mask_detailed = df['occ_level'] == 'detailed'
-        if mask_detailed.any():
-            totals_detailed = df.loc[mask_detailed].groupby('segment')[col].transform('sum')
-            df.loc[mask_detailed, f'pct_seg_detailed_{year}'] = np.where(
-                totals_detailed > 0,
-                df.loc[mask_detailed, col] / totals_detailed,
-                np.nan
-            )
-        else:
-            df[f'pct_seg_detailed_{year}'] = np.nan
+        for level in ('major', 'detailed'):
+            df[f'pct_seg_{level}_{year}'] = shares[f'empl_{year}'].where(share_level == level)
     df['level_change_2021_2024'] = df['empl_2024'] - df['empl_2021']
     df['pct_change_2021_2024'] = np.where(
         (df['empl_2021'].notna()) & (df['empl_2021'] != 0) & df['empl_2024'].notna(),
@@ -126,10 +146,10 @@ def compute_segment_shares(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def find_column(columns: Iterable[str], *tokens: str) -> str:
+def find_column(columns: Iterable[Tuple[str, str]], *tokens: str) -> str:
+    """First column whose lowercased name contains every token; `columns` holds (name, lowercased name) pairs."""
     lower_tokens = [t.lower() for t in tokens]
-    for col in columns:
-        col_lower = col.lower()
+    for col, col_lower in columns:
         if all(tok in col_lower for tok in lower_tokens):
             return col
     raise KeyError(f'Unable to locate column with tokens {tokens}')
@@ -137,7 +157,8 @@ def find_column(columns: Iterable[str], *tokens: str) -> str:
 
 def load_ep_data() -> pd.DataFrame:
     df = pd.read_excel(RAW_EP, sheet_name='Table 1.2', skiprows=1)
-    columns = list(df.columns)
+    # Lowercase the headers once for all the lookups below
+    columns = [(col, str(col).lower()) for col in df.columns]
     col_map: Dict[str, str] = {
         find_column(columns, 'matrix', 'title'): 'ep_title',
         find_column(columns, 'matrix', 'code'): 'occcd',
@@ -158,30 +179,7 @@ def load_ep_data() -> pd.DataFrame:
     ep_df['ep_work_experience'] = ep_df['ep_work_experience'].astype(str).str.strip()
     ep_df['ep_on_the_job_training'] = ep_df['ep_on_the_job_training'].astype(str).str.strip()
 
-    def categorize_education(value: str) -> str:
-        if not isinstance(value, str):
-            return np.nan
-        value = value.strip()
-        if value in {
-            'No formal educational credential',
-            'High school diploma or equivalent'
-        }:
-            return 'HS or less'
-        if value in {
-            "Postsecondary nondegree award",
-            "Associate's degree",
-            'Some college, no degree'
-        }:
-            return "SC or associate's"
-        if value in {
-            "Bachelor's degree",
-            "Master's degree",
-            'Doctoral or professional degree'
-        }:
-            return 'BA+'
-        return np.nan
-
-    ep_df['ep_edu_grouped'] = ep_df['ep_entry_education'].apply(categorize_education)
+    ep_df['ep_edu_grouped'] = ep_df['ep_entry_education'].map(EDU_GROUPS)
     return ep_df
 
 
@@ -196,120 +194,66 @@ def attach_ep(df: pd.DataFrame, ep_df: pd.DataFrame) -> pd.DataFrame:
 
 
 def build_long(df: pd.DataFrame) -> pd.DataFrame:
-    share_2021 = np.where(
-        df['occ_level'] == 'major',
-        df['pct_seg_major_2021'],
-        np.where(df['occ_level'] == 'detailed', df['pct_seg_detailed_2021'], np.nan)
-    )
-    share_2024 = np.where(
-        df['occ_level'] == 'major',
-        df['pct_seg_major_2024'],
-        np.where(df['occ_level'] == 'detailed', df['pct_seg_detailed_2024'], np.nan)
-    )
-    long_frames = []
-    long_frames.append(
-        pd.DataFrame(
-            {
-                'segment': df['segment'],
-                'occcd': df['occcd'],
-                'soctitle': df['soctitle'],
-                'occ_level': df['occ_level'],
-                'year': YEARS[0],
-                'employment': df['empl_2021'],
-                'share_within_level': share_2021,
-            }
-        )
-    )
-    long_frames.append(
-        pd.DataFrame(
-            {
-                'segment': df['segment'],
-                'occcd': df['occcd'],
-                'soctitle': df['soctitle'],
-                'occ_level': df['occ_level'],
-                'year': YEARS[1],
-                'employment': df['empl_2024'],
-                'share_within_level': share_2024,
-            }
-        )
-    )
-    long_df = pd.concat(long_frames, ignore_index=True)
+    # One block of rows per year, stacked in YEARS order: year-column pairs are unravelled column-major
+    n_years = len(YEARS)
     ep_cols = [c for c in df.columns if c.startswith('ep_')]
-    if ep_cols:
-        long_df = long_df.merge(df[['segment', 'occcd'] + ep_cols], on=['segment', 'occcd'], how='left')
+    long_df = df[['segment', 'occcd', 'soctitle', 'occ_level'] + ep_cols].iloc[np.tile(np.arange(len(df)), n_years)]
+    long_df = long_df.reset_index(drop=True)
+
+    level = long_df['occ_level'].to_numpy()
+    major = df[[f'pct_seg_major_{year}' for year in YEARS]].to_numpy(dtype=float).ravel(order='F')
+    detailed = df[[f'pct_seg_detailed_{year}' for year in YEARS]].to_numpy(dtype=float).ravel(order='F')
+    long_df.insert(4, 'year', np.repeat(YEARS, len(df)))
+    long_df.insert(5, 'employment', df[[f'empl_{year}' for year in YEARS]].to_numpy().ravel(order='F'))
+    long_df.insert(6, 'share_within_level',
+                   np.where(level == 'major', major, np.where(level == 'detailed', detailed, np.nan)))
     return long_df
 
 
 def build_education_summary(detailed_df: pd.DataFrame) -> pd.DataFrame:
-    edu_df = detailed_df.copy()
-    edu_df = edu_df[~edu_df['ep_edu_grouped'].isna()]
+    edu_df = detailed_df[detailed_df['ep_edu_grouped'].notna()]
     if edu_df.empty:
         return pd.DataFrame()
 
+    value_cols = ['empl_2021', 'empl_2024', 'level_change_2021_2024']
+    total_cols = ['total_2021', 'total_2024', 'total_change']
+
     grouped = (
         edu_df
-        .groupby(['segment', 'ep_edu_grouped'], as_index=False)
-        .agg(
-            empl_2021=('empl_2021', 'sum'),
-            empl_2024=('empl_2024', 'sum'),
-            level_change_2021_2024=('level_change_2021_2024', 'sum')
-        )
-    )
-    grouped['total_2021'] = grouped.groupby('segment')['empl_2021'].transform('sum')
-    grouped['total_2024'] = grouped.groupby('segment')['empl_2024'].transform('sum')
-    grouped['total_change'] = grouped.groupby('segment')['level_change_2021_2024'].transform('sum')
-    grouped['pct_change_2021_2024'] = np.where(
-        grouped['empl_2021'] > 0,
-        (grouped['empl_2024'] / grouped['empl_2021'] - 1) * 100,
-        np.nan
-    )
-    grouped['percent_share_change_21_24'] = np.where(
-        grouped['total_change'] != 0,
-        grouped['level_change_2021_2024'] / grouped['total_change'],
-        np.nan
-    )
-    grouped['share_2021'] = np.where(
-        grouped['total_2021'] > 0,
-        grouped['empl_2021'] / grouped['total_2021'],
-        np.nan
-    )
-    grouped['share_2024'] = np.where(
-        grouped['total_2024'] > 0,
-        grouped['empl_2024'] / grouped['total_2024'],
-        np.nan
+        .groupby(['segment', 'ep_edu_grouped'], observed=True)[value_cols]
+        .sum()
+        .reset_index()
     )
+    # One grouping pass for all three segment totals
+    grouped[total_cols] = grouped.groupby('segment', observed=True, sort=False)[value_cols].transform('sum').to_numpy()
+    grouped['segment'] = grouped['segment'].astype(str)
 
-    overall = grouped.groupby('ep_edu_grouped', as_index=False).agg(
-        empl_2021=('empl_2021', 'sum'),
-        empl_2024=('empl_2024', 'sum'),
-        level_change_2021_2024=('level_change_2021_2024', 'sum')
-    )
+    overall = grouped.groupby('ep_edu_grouped', as_index=False)[value_cols].sum()
     overall['segment'] = 'All Segments Combined'
-    overall['total_2021'] = overall['empl_2021'].sum()
-    overall['total_2024'] = overall['empl_2024'].sum()
-    overall['total_change'] = overall['level_change_2021_2024'].sum()
-    overall['pct_change_2021_2024'] = np.where(
-        overall['empl_2021'] > 0,
-        (overall['empl_2024'] / overall['empl_2021'] - 1) * 100,
+    overall = overall.assign(**dict(zip(total_cols, overall[value_cols].sum())))
+
+    combined = pd.concat([grouped, overall], ignore_index=True)
+    combined['pct_change_2021_2024'] = np.where(
+        combined['empl_2021'] > 0,
+        (combined['empl_2024'] / combined['empl_2021'] - 1) * 100,
         np.nan
     )
-    overall['percent_share_change_21_24'] = np.where(
-        overall['total_change'] != 0,
-        overall['level_change_2021_2024'] / overall['total_change'],
+    combined['percent_share_change_21_24'] = np.where(
+        combined['total_change'] != 0,
+        combined['level_change_2021_2024'] / combined['total_change'],
         np.nan
     )
-    overall['share_2021'] = np.where(
-        overall['total_2021'] > 0,
-        overall['empl_2021'] / overall['total_2021'],
+    combined['share_2021'] = np.where(
+        combined['total_2021'] > 0,
+        combined['empl_2021'] / combined['total_2021'],
         np.nan
     )
-    overall['share_2024'] = np.where(
-        overall['total_2024'] > 0,
-        overall['empl_2024'] / overall['total_2024'],
+    combined['share_2024'] = np.where(
+        combined['total_2024'] > 0,
+        combined['empl_2024'] / combined['total_2024'],
         np.nan
     )
 
-    combined = pd.concat([grouped, overall], ignore_index=True)
     combined = combined.rename(columns={'ep_edu_grouped': 'edu_group'})
     return combined[['segment', 'edu_group', 'empl_2021', 'empl_2024', 'level_change_2021_2024',
                      'pct_change_2021_2024', 'percent_share_change_21_24', 'share_2021', 'share_2024']]
@@ -318,8 +262,8 @@ def build_education_summary(detailed_df: pd.DataFrame) -> pd.DataFrame:
 def write_segmented_excel(df: pd.DataFrame, path: Path, sort_cols: List[str]) -> None:
     if df.empty:
         return
-    with pd.ExcelWriter(path) as writer:
-        for segment, seg_df in df.groupby('segment'):
+    with pd.ExcelWriter(path, engine=EXCEL_WRITER_ENGINE) as writer:
+        for segment, seg_df in df.groupby('segment', observed=True):
             sheet_name = sanitize_sheet_name(segment)
             seg_out = seg_df.drop(columns=['segment']).sort_values(sort_cols)
             seg_out.to_excel(writer, sheet_name=sheet_name, index=False)
@@ -328,7 +272,7 @@ def write_segmented_excel(df: pd.DataFrame, path: Path, sort_cols: List[str]) ->
 def write_long_excel(df: pd.DataFrame, path: Path) -> None:
     if df.empty:
         return
-    with pd.ExcelWriter(path) as writer:
+    with pd.ExcelWriter(path, engine=EXCEL_WRITER_ENGINE) as writer:
         df.sort_values(['segment', 'occ_level', 'occcd', 'year']).to_excel(writer, sheet_name='Long', index=False)
 
 
@@ -340,23 +284,29 @@ def main() -> None:
     ep_df = load_ep_data()
     wide = attach_ep(wide, ep_df)
 
-    wide.to_csv(INTERIM_WIDE_PATH, index=False)
+    write_csv(wide, INTERIM_WIDE_PATH)
 
     long_df = build_long(wide)
-    long_df.to_csv(INTERIM_LONG_PATH, index=False)
+    write_csv(long_df, INTERIM_LONG_PATH)
 
     major = wide[wide['occ_level'] == 'major'].copy()
     detailed = wide[wide['occ_level'] == 'detailed'].copy()
-    major.to_csv(PROCESSED_MAJOR_PATH, index=False)
-    detailed.to_csv(PROCESSED_DETAILED_PATH, index=False)
+    write_csv(major, PROCESSED_MAJOR_PATH)
+    write_csv(detailed, PROCESSED_DETAILED_PATH)
 
     edu_summary = build_education_summary(detailed)
     if not edu_summary.empty:
-        edu_summary.to_csv(PROCESSED_EDU_SUMMARY_PATH, index=False)
-
-    write_segmented_excel(major, PROCESSED_MAJOR_XLSX, sort_cols=['occ_level', 'occcd'])
-    write_segmented_excel(detailed, PROCESSED_DETAILED_XLSX, sort_cols=['occ_level', 'empl_2024', 'occcd'])
-    write_long_excel(long_df, PROCESSED_LONG_XLSX)
+        write_csv(edu_summary, PROCESSED_EDU_SUMMARY_PATH)
+
+    # The three workbooks go to separate files and the writers are pure Python, so write them side by side
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        jobs = [
+            pool.submit(write_segmented_excel, major, PROCESSED_MAJOR_XLSX, ['occ_level', 'occcd']),
+            pool.submit(write_segmented_excel, detailed, PROCESSED_DETAILED_XLSX, ['occ_level', 'empl_2024', 'occcd']),
+            pool.submit(write_long_excel, long_df, PROCESSED_LONG_XLSX),
+        ]
+        for job in jobs:
+            job.result()
 
 
 if __name__ == '__main__':
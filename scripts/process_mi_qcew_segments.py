@@ -5,6 +5,9 @@ from pathlib import Path
 
 import pandas as pd
 
+from _csv_io import write_csv
+from _excel_io import EXCEL_ENGINE
+
 RAW_QCEW_PATH = Path('data/raw/MI-QCEW-38-NAICS-2001-2024.xlsx')
 SEGMENT_LOOKUP_PATH = Path('data/lookups/segment_assignments.csv')
 
@@ -29,14 +32,13 @@ SEGMENT_LABELS = {
 
 
 def load_qcew() -> pd.DataFrame:
-    wide = pd.read_excel(RAW_QCEW_PATH, skiprows=3)
+    wide = pd.read_excel(RAW_QCEW_PATH, skiprows=3, engine=EXCEL_ENGINE)
     wide = wide.rename(columns={'Series ID': 'series_id'})
     year_columns = {}
     for col in wide.columns:
         if isinstance(col, str) and col.startswith('Annual'):
             year = int(col.split('\n')[-1])
             year_columns[col] = year
-    wide = wide[['series_id', *year_columns.keys()]]
     long_df = wide.melt(id_vars='series_id', value_vars=year_columns.keys(),
                         var_name='year', value_name='employment')
     long_df['year'] = long_df['year'].map(year_columns)
@@ -51,20 +53,20 @@ def add_segment_metadata(df: pd.DataFrame) -> pd.DataFrame:
     lookup = pd.read_csv(SEGMENT_LOOKUP_PATH, dtype={'naics_code': str})[
         ['naics_code', 'segment_id', 'segment_name', 'stage']
     ].drop_duplicates()
-    merged = df.merge(lookup, on='naics_code', how='left', indicator=True)
-    missing = merged[merged['_merge'] == 'left_only']['naics_code'].unique()
-    if len(missing) > 0:
+    missing = set(df['naics_code'].unique()) - set(lookup['naics_code'])
+    if missing:
         raise ValueError(f'Missing segment assignment for NAICS codes: {", ".join(sorted(missing))}')
-    merged = merged.drop(columns=['_merge'])
+    merged = df.merge(lookup, on='naics_code', how='left')
     merged['segment_id'] = pd.to_numeric(merged['segment_id'], errors='coerce').astype('Int64')
-    merged['segment_label'] = merged['segment_id'].map(SEGMENT_LABELS)
-    merged['stage'] = merged['stage'].astype(str)
+    # Low-cardinality group keys as categoricals (sorted categories keep the output order)
+    merged['segment_label'] = merged['segment_id'].map(SEGMENT_LABELS).astype('category')
+    merged['stage'] = merged['stage'].astype(str).astype('category')
     return merged
 
 
 def aggregate_to_segment(df: pd.DataFrame) -> pd.DataFrame:
     seg = (
-        df.groupby(['segment_id', 'segment_label', 'year'], as_index=False)
+        df.groupby(['segment_id', 'segment_label', 'year'], as_index=False, observed=True)
         ['employment'].sum(min_count=1)
         .rename(columns={'employment': 'employment_qcew'})
     )
@@ -73,7 +75,7 @@ def aggregate_to_segment(df: pd.DataFrame) -> pd.DataFrame:
 
 def aggregate_to_stage(df: pd.DataFrame) -> pd.DataFrame:
     stage = (
-        df.groupby(['stage', 'year'], as_index=False)
+        df.groupby(['stage', 'year'], as_index=False, observed=True)
         ['employment'].sum(min_count=1)
         .rename(columns={'employment': 'employment_qcew'})
     )
@@ -84,16 +86,16 @@ def main() -> None:
     qcew_long = load_qcew()
     qcew_long = add_segment_metadata(qcew_long)
 
-    qcew_long.to_csv(RAW_LONG_OUTPUT, index=False)
+    write_csv(qcew_long, RAW_LONG_OUTPUT)
 
     segment_ts = aggregate_to_segment(qcew_long)
     stage_ts = aggregate_to_stage(qcew_long)
 
-    segment_ts.sort_values(['segment_id', 'year']).to_csv(SEGMENT_OUTPUT, index=False)
-    stage_ts.sort_values(['stage', 'year']).to_csv(STAGE_OUTPUT, index=False)
+    write_csv(segment_ts.sort_values(['segment_id', 'year']), SEGMENT_OUTPUT)
+    write_csv(stage_ts.sort_values(['stage', 'year']), STAGE_OUTPUT)
 
-    segment_ts.to_csv(SEGMENT_PROCESSED_OUTPUT, index=False)
-    stage_ts.to_csv(STAGE_PROCESSED_OUTPUT, index=False)
+    write_csv(segment_ts, SEGMENT_PROCESSED_OUTPUT)
+    write_csv(stage_ts, STAGE_PROCESSED_OUTPUT)
 
 
 if __name__ == '__main__':
@@ -1,8 +1,10 @@
 import pandas as pd
 from pathlib import Path
 
-RAW_PATH = Path("data/raw/Moody's Supply Chain Employment and Output 1970-2055.xlsx")
-LOOKUP_PATH = Path("data/lookups/segment_assignments.csv")
+from _csv_io import write_csv
+from _lookup import LOOKUP_PATH, load_segments
+from _moodys_io import add_metric_keys, load_moodys
+
 INTERIM_DIR = Path("data/interim")
 YEARS = (2024, 2030)
 METRIC_MAP = {
@@ -17,11 +19,7 @@ NAICS_REMAPPINGS = {
 
 
 def load_data():
-    df = pd.read_excel(RAW_PATH)
-    df = df.assign(
-        metric=df['Description:'].str.split(':').str[0].str.strip(),
-        naics_code=df['Mnemonic:'].str.extract(r"(\d{4})").iloc[:, 0].str.zfill(4)
-    )
+    df = add_metric_keys(load_moodys())
     for year in YEARS:
         ts = pd.Timestamp(year=year, month=12, day=31)
         if ts not in df.columns:
@@ -30,33 +28,43 @@ def load_data():
 
 
 def compute_geography_table(df, geography):
-    subset = df[df['Geography:'] == geography].copy()
-    subset['metric_key'] = subset['metric'].map(METRIC_MAP)
-    subset = subset[subset['metric_key'].notna()]
-    subset[f'value_{YEARS[0]}'] = subset[pd.Timestamp(YEARS[0], 12, 31)]
-    subset[f'value_{YEARS[1]}'] = subset[pd.Timestamp(YEARS[1], 12, 31)]
-    base = subset[f'value_{YEARS[0]}']
-    target = subset[f'value_{YEARS[1]}']
-    subset['pct_change'] = (target - base) / base.replace({0: pd.NA}) * 100
-    subset.loc[base == 0, 'pct_change'] = pd.NA
-
-    pivot_2024 = subset.pivot(index='naics_code', columns='metric_key', values=f'value_{YEARS[0]}').add_prefix(f'{YEARS[0]}_')
-    pivot_2030 = subset.pivot(index='naics_code', columns='metric_key', values=f'value_{YEARS[1]}').add_prefix(f'{YEARS[1]}_')
-    pivot_pct = subset.pivot(index='naics_code', columns='metric_key', values='pct_change').add_prefix(f'pct_change_{YEARS[0]}_{YEARS[1]}_')
-
-    result = pd.concat([pivot_2024, pivot_2030, pivot_pct], axis=1).reset_index()
+    subset = df[df['Geography:'] == geography]
+    subset = subset.assign(metric_key=subset['metric'].map(METRIC_MAP)).dropna(subset=['metric_key'])
+    base_col, target_col = (pd.Timestamp(year, 12, 31) for year in YEARS)
+
+    # One pivot for both years; the percent change is computed on the wide blocks
+    wide = subset.pivot(index='naics_code', columns='metric_key', values=[base_col, target_col])
+    base = wide[base_col]
+    target = wide[target_col]
+    pct_change = (target - base) / base.where(base != 0) * 100
+
+    result = pd.concat(
+        [
+            base.add_prefix(f'{YEARS[0]}_'),
+            target.add_prefix(f'{YEARS[1]}_'),
+            pct_change.add_prefix(f'pct_change_{YEARS[0]}_{YEARS[1]}_'),
+        ],
+        axis=1,
+    ).reset_index()
     return result
 
 
 def apply_remappings(df):
-    df = df.copy()
-    for target, source in NAICS_REMAPPINGS.items():
-        if target not in df['naics_code'].values and source in df['naics_code'].values:
-            row = df[df['naics_code'] == source].copy()
-            if not row.empty:
-                row['naics_code'] = target
-                df = pd.concat([df, row], ignore_index=True)
-    return df
+    # Copy each source row to its target code when only the source is present
+    existing = set(df['naics_code'])
+    pairs = pd.DataFrame(
+        [(target, source) for target, source in NAICS_REMAPPINGS.items()
+         if target not in existing and source in existing],
+        columns=['target', 'naics_code'],
+    )
+    if pairs.empty:
+        return df.copy()
+    added = (
+        df.merge(pairs, on='naics_code')
+        .drop(columns='naics_code')
+        .rename(columns={'target': 'naics_code'})[df.columns]
+    )
+    return pd.concat([df, added], ignore_index=True)
 
 
 def rename_columns_for_lookup(mi_df):
@@ -83,11 +91,10 @@ def main():
     INTERIM_DIR.mkdir(parents=True, exist_ok=True)
     us_path = INTERIM_DIR / 'moodys_us_2024_2030.csv'
     mi_path = INTERIM_DIR / 'moodys_michigan_2024_2030.csv'
-    us_table.to_csv(us_path, index=False)
-    mi_table.to_csv(mi_path, index=False)
+    write_csv(us_table, us_path)
+    write_csv(mi_table, mi_path)
 
-    lookup = pd.read_csv(LOOKUP_PATH)
-    lookup['naics_code'] = lookup['naics_code'].astype(str).str.zfill(4)
+    lookup = load_segments()
 
     columns_to_remove = [
         c for c in lookup.columns
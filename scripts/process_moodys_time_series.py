@@ -4,8 +4,13 @@ from __future__ import annotations
 from pathlib import Path
 import warnings
 import re
+import numpy as np
 import pandas as pd
 
+from _csv_io import write_csv
+from _lookup import load_segments
+from _moodys_io import load_moodys
+
 # Silence benign openpyxl style warning
 warnings.filterwarnings(
     "ignore",
@@ -18,7 +23,6 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 REPO_ROOT = SCRIPT_DIR.parent
 
 RAW_XLSX = REPO_ROOT / "data" / "raw" / "Moody's Supply Chain Employment and Output 1970-2055.xlsx"
-SEGMENT_LOOKUP_PATH = REPO_ROOT / "data" / "lookups" / "segment_assignments.csv"
 
 OUT_DIR = REPO_ROOT / "data" / "interim"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -34,78 +38,71 @@ OUT_STG_US_YOY = OUT_DIR / "moodys_us_stages_timeseries_yoy.csv"
 
 # ---------- Config ----------
 NAICS_OVERRIDES = {"4471": "4571"}  # e.g., legacy -> current gas stations
+GEOGRAPHIES = ("Michigan", "United States")  # exact labels from the file
 METRICS = ("employment", "wages", "gdp")  # we normalize "output"/"gdp" to gdp
+# Checked in order, so "employment" wins over the wage and output keywords
+METRIC_PATTERNS = {
+    "employment": re.compile(r"employment"),
+    "wages": re.compile(r"wage|earnings|compensation"),
+    "gdp": re.compile(r"output|gdp|gross|value added"),
+}
+YEAR_END_COL_RE = re.compile(r"(\d{4})-12-31(?: 00:00:00)?")
 
 
 def load_segment_lookup() -> pd.DataFrame:
     """Expect columns: naics_code, segment_id, segment_name, stage"""
-    lk = pd.read_csv(SEGMENT_LOOKUP_PATH, dtype={"naics_code": str}).drop_duplicates("naics_code")
-    req = {"naics_code", "segment_id", "segment_name", "stage"}
-    missing = req - set(lk.columns)
-    if missing:
-        raise KeyError(f"Missing columns in segment lookup: {missing}")
+    lk = load_segments().drop_duplicates("naics_code")
     lk["segment_id"] = pd.to_numeric(lk["segment_id"], errors="raise").astype(int)
     lk["segment_name"] = lk["segment_name"].astype(str)
     lk["stage"] = lk["stage"].astype(str)
     return lk[["naics_code", "segment_id", "segment_name", "stage"]]
 
 
-def infer_metric(desc: str) -> str:
-    d = (desc or "").lower()
-    if "employment" in d:
-        return "employment"
-    if "wage" in d or "earnings" in d or "compensation" in d:
-        return "wages"
-    if "output" in d or "gdp" in d or "gross" in d or "value added" in d:
-        return "gdp"
-    return "other"
+def infer_metric(desc: pd.Series) -> np.ndarray:
+    """Map series descriptions to employment / wages / gdp (first match wins), else 'other'."""
+    d = desc.str.lower()
+    conditions = [d.str.contains(pattern, regex=True, na=False) for pattern in METRIC_PATTERNS.values()]
+    return np.select(conditions, list(METRIC_PATTERNS), default="other")
 
 
-def read_wide() -> pd.DataFrame:
+def read_wide() -> tuple[pd.DataFrame, dict]:
     """
     Reads the single sheet with header row 0, where columns are:
       - 'Mnemonic:', 'Description:', 'Source:', 'Native Frequency:', 'Geography:'
       - year columns labeled as 'YYYY-12-31 00:00:00'
+    Returns the frame and a {year column: year} map.
     """
     if not RAW_XLSX.exists():
         raise FileNotFoundError(f"Raw workbook not found: {RAW_XLSX}")
 
-    df = pd.read_excel(RAW_XLSX, sheet_name=0, header=0)
-
-    # Identify year columns by parseable year-end date headers
-    year_cols = []
-    for c in df.columns:
-        s = str(c)
-        # Fast-path for the exact format we saw
-        if s.endswith("00:00:00") and "-" in s:
-            try:
-                ts = pd.to_datetime(s, errors="raise")
-                if ts.month == 12 and ts.day == 31:
-                    year_cols.append(c)
-            except Exception:
-                pass
-        else:
-            # Fallback: try parse any date-like header and keep year-ends
-            try:
-                ts = pd.to_datetime(s, errors="raise")
-                if ts.month == 12 and ts.day == 31:
-                    year_cols.append(c)
-            except Exception:
-                pass
+    # Parsed once and reused from the Parquet cache until the workbook changes;
+    # the header is read first so only the needed columns are loaded
+    header = load_moodys(nrows=1).columns
+
+    # Year-end period headers -> calendar year, parsed once
+    year_map = {}
+    for c in header:
+        m = YEAR_END_COL_RE.fullmatch(str(c))
+        if m:
+            year_map[c] = int(m.group(1))
+    year_cols = list(year_map)
 
     if not year_cols:
         raise ValueError("No year-end date columns found (expected 'YYYY-12-31 00:00:00').")
 
     # Keep only what we need
     keep = ["Mnemonic:", "Description:", "Geography:", *year_cols]
-    missing = [k for k in keep[:3] if k not in df.columns]
+    missing = [k for k in keep[:3] if k not in header]
     if missing:
         raise KeyError(f"Missing required attribute column(s): {missing}")
 
-    df = df[keep].copy()
+    df = load_moodys(columns=keep)
+
+    # Only the geographies written out are carried into the melt
+    df = df[df["Geography:"].isin(GEOGRAPHIES)].copy()
 
     # Metric & NAICS
-    df["metric"] = df["Description:"].astype(str).map(infer_metric)
+    df["metric"] = infer_metric(df["Description:"].astype(str))
     df = df[df["metric"].isin(METRICS)].copy()
 
     df["naics_code"] = df["Mnemonic:"].astype(str).str.extract(r"(\d{4})")[0]
@@ -115,30 +112,30 @@ def read_wide() -> pd.DataFrame:
     df = df.dropna(subset=["naics_code", "Geography:"]).copy()
     df["naics_code"] = df["naics_code"].astype(str)
 
-    return df, year_cols
+    # Low-cardinality keys as categoricals for the groupby/unstack and the geography filters
+    # (sorted categories keep the output sort order)
+    df = df.astype({"naics_code": "category", "Geography:": "category", "metric": "category"})
+
+    return df, year_map
 
 
-def melt_to_long(df: pd.DataFrame, year_cols: list) -> pd.DataFrame:
+def melt_to_long(df: pd.DataFrame, year_map: dict) -> pd.DataFrame:
     """
-    Long format: one row per NAICS-year-metric with value column,
-    then pivot metrics to columns: employment, wages, gdp
+    Long format: one row per NAICS-geography-year,
+    with metrics as columns: employment, wages, gdp
     """
-    long = df.melt(
-        id_vars=["naics_code", "metric", "Geography:"],
-        value_vars=year_cols,
-        var_name="date",
-        value_name="value",
+    # Collapse duplicate (NAICS, geography, metric) rows on the small wide frame, keeping the
+    # first non-null value per year, so the long frame is unique and a plain unstack suffices
+    wide = df.groupby(["naics_code", "Geography:", "metric"], sort=False, observed=True)[list(year_map)].first()
+    wide = wide.rename(columns=year_map)
+    long = (
+        wide.reset_index()
+        .melt(id_vars=["naics_code", "Geography:", "metric"], var_name="year", value_name="value")
+        .dropna(subset=["value"])
+        .set_index(["naics_code", "Geography:", "year", "metric"])["value"]
+        .unstack("metric")
+        .reset_index()
     )
-    long["year"] = pd.to_datetime(long["date"]).dt.year
-    long = long.drop(columns=["date"])
-
-    # Pivot to metric columns
-    long = long.pivot_table(
-        index=["naics_code", "Geography:", "year"],
-        columns="metric",
-        values="value",
-        aggfunc="first",
-    ).reset_index()
 
     # Ensure all metric columns exist
     for m in METRICS:
@@ -173,54 +170,29 @@ def compute_yoy_pct(df: pd.DataFrame, group_cols: list[str]) -> pd.DataFrame:
     Compute year-over-year % change for employment, wages, gdp by group and calendar year.
     Returns columns: group_cols + ['year', 'employment_yoy_pct', 'wages_yoy_pct', 'gdp_yoy_pct'].
     """
-    metrics = ["employment", "wages", "gdp"]
-    out = []
-
-    for keys, g in df.groupby(group_cols, dropna=False):
-        years_present = sorted(g["year"].unique())
-        if not years_present:
-            continue
-
-        # Reindex to a continuous year index so t-1 is truly previous calendar year
-        idx = range(min(years_present), max(years_present) + 1)
-        g2 = g.set_index("year").reindex(idx)
-        # Ensure numeric
-        for m in metrics:
-            g2[m] = pd.to_numeric(g2[m], errors="coerce")
-
-        # Compute YoY = (t - t-1) / (t-1) * 100, but leave NaN when prior is 0 or missing
-        for m in metrics:
-            prev = g2[m].shift(1)
-            yoy = (g2[m] - prev) / prev * 100
-            yoy[prev == 0] = pd.NA
-            g2[m + "_yoy_pct"] = yoy
-
-        # Keep only rows for years present in the original group
-        keep = g2.loc[years_present, [m + "_yoy_pct" for m in metrics]].copy()
-        keep.index.name = "year"
-        keep = keep.reset_index()
-
-        # Attach group key columns
-        if isinstance(keys, tuple):
-            for i, col in enumerate(group_cols):
-                keep[col] = keys[i]
-        else:
-            keep[group_cols[0]] = keys
-
-        cols = group_cols + ["year", "employment_yoy_pct", "wages_yoy_pct", "gdp_yoy_pct"]
-        out.append(keep[cols])
-
-    if not out:
-        return pd.DataFrame(columns=group_cols + ["year", "employment_yoy_pct", "wages_yoy_pct", "gdp_yoy_pct"])
-
-    res = pd.concat(out, ignore_index=True)
-    return res.sort_values(group_cols + ["year"]).reset_index(drop=True)
+    metrics = list(METRICS)
+    df = df.sort_values(group_cols + ["year"]).reset_index(drop=True)
+    df[metrics] = df[metrics].apply(pd.to_numeric, errors="coerce")
+
+    # t-1 is the previous row of the same group, but only when it is truly the previous calendar year
+    prev = df.groupby(group_cols, dropna=False, sort=False)[["year", *metrics]].shift(1)
+    prev_values = prev[metrics].to_numpy(dtype=float)
+    prev_values[(prev["year"] != df["year"] - 1).to_numpy()] = np.nan
+
+    # YoY = (t - t-1) / (t-1) * 100, but leave NaN when prior is 0 or missing
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yoy = (df[metrics].to_numpy(dtype=float) - prev_values) / prev_values * 100
+    yoy[prev_values == 0] = np.nan
+
+    res = df[group_cols + ["year"]].copy()
+    res[[m + "_yoy_pct" for m in metrics]] = yoy
+    return res
 
 
 def main() -> None:
     lookup = load_segment_lookup()
-    wide, year_cols = read_wide()
-    long_all = melt_to_long(wide, year_cols)
+    wide, year_map = read_wide()
+    long_all = melt_to_long(wide, year_map)
 
     # Split by geography (exact labels from the file)
     long_mi = long_all[long_all["Geography:"].eq("Michigan")].drop(columns=["Geography:"])
@@ -243,10 +215,10 @@ def main() -> None:
     stg_us = aggregate_timeseries(long_us, lookup, ["stage"])
 
     # Write outputs
-    seg_mi.to_csv(OUT_SEG_MI, index=False)
-    seg_us.to_csv(OUT_SEG_US, index=False)
-    stg_mi.to_csv(OUT_STG_MI, index=False)
-    stg_us.to_csv(OUT_STG_US, index=False)
+    write_csv(seg_mi, OUT_SEG_MI)
+    write_csv(seg_us, OUT_SEG_US)
+    write_csv(stg_mi, OUT_STG_MI)
+    write_csv(stg_us, OUT_STG_US)
     
     # YoY % changes for segments
     seg_mi_yoy = compute_yoy_pct(seg_mi, ["segment_id", "segment_name"])
@@ -257,10 +229,10 @@ def main() -> None:
     stg_us_yoy = compute_yoy_pct(stg_us, ["stage"])
 
     # Write YoY outputs
-    seg_mi_yoy.to_csv(OUT_SEG_MI_YOY, index=False)
-    seg_us_yoy.to_csv(OUT_SEG_US_YOY, index=False)
-    stg_mi_yoy.to_csv(OUT_STG_MI_YOY, index=False)
-    stg_us_yoy.to_csv(OUT_STG_US_YOY, index=False)
+    write_csv(seg_mi_yoy, OUT_SEG_MI_YOY)
+    write_csv(seg_us_yoy, OUT_SEG_US_YOY)
+    write_csv(stg_mi_yoy, OUT_STG_MI_YOY)
+    write_csv(stg_us_yoy, OUT_STG_US_YOY)
     
     print(f"Wrote: {OUT_SEG_MI}")
     print(f"Wrote: {OUT_SEG_US}")
@@ -2,6 +2,9 @@
 import pandas as pd
 from pathlib import Path
 
+from _csv_io import write_csv, write_parquet
+from _excel_io import EXCEL_ENGINE, EXCEL_WRITER_ENGINE
+
 RAW_DIR = Path('data/raw')
 INTERIM_DIR = Path('data/interim')
 PROCESSED_DIR = Path('data/processed')
@@ -24,35 +27,51 @@ NUMERIC_FIELDS = [
 INVALID_CHARS = {chr(0xFFFD): pd.NA, chr(0x2014): pd.NA, chr(0x2013): pd.NA}
 
 def get_column_mapping(columns: list[str], year: int) -> dict[str, str]:
-    def find(*phrases: str) -> str:
-        for col in columns:
-            if all(phrase in str(col) for phrase in phrases):
-                return col
-        raise KeyError(f'Could not locate column with tokens {phrases} for year {year}')
-
-    mapping = {
-        'title': find('National Employment Matrix title'),
-        'code': find('National Employment Matrix code'),
-        'type': find('Occupation type'),
-        'employment_base': find('Employment,', str(year)),
-        'employment_proj': find('Employment,', str(year + 10)),
-        'share_base': find('Employment distribution', str(year)),
-        'share_proj': find('Employment distribution', str(year + 10)),
-        'change_numeric': find('Employment change, numeric'),
-        'change_percent': find('Employment change, percent'),
-        'self_employed': find('Percent self employed'),
-        'openings': find('Occupational openings'),
-        'median_wage': find('Median annual wage'),
+    required = {
+        'title': ('National Employment Matrix title',),
+        'code': ('National Employment Matrix code',),
+        'type': ('Occupation type',),
+        'employment_base': ('Employment,', str(year)),
+        'employment_proj': ('Employment,', str(year + 10)),
+        'share_base': ('Employment distribution', str(year)),
+        'share_proj': ('Employment distribution', str(year + 10)),
+        'change_numeric': ('Employment change, numeric',),
+        'change_percent': ('Employment change, percent',),
+        'self_employed': ('Percent self employed',),
+        'openings': ('Occupational openings',),
+        'median_wage': ('Median annual wage',),
     }
+    # Header labels are stringified once; each field stops at its first matching column
+    labels = [(col, str(col)) for col in columns]
+    mapping = {}
+    for field, phrases in required.items():
+        match = next((col for col, label in labels if all(phrase in label for phrase in phrases)), None)
+        if match is None:
+            raise KeyError(f'Could not locate column with tokens {phrases} for year {year}')
+        mapping[field] = match
     return mapping
 
 def load_year(year: int) -> pd.DataFrame:
+    """Cleaned Table 1.2 for `year`, reused from a Parquet cache until the workbook or this script changes."""
     path = RAW_DIR / FILE_TEMPLATE.format(year=year)
-    read_kwargs = {'sheet_name': SHEET_NAME}
+    cache = INTERIM_DIR / f'occupation_table12_{year}.parquet'
+    source_mtime = max(path.stat().st_mtime, Path(__file__).stat().st_mtime)
+    if cache.exists() and cache.stat().st_mtime >= source_mtime:
+        return pd.read_parquet(cache)
+
+    df = clean_year(read_year(path, year), year)
+    INTERIM_DIR.mkdir(parents=True, exist_ok=True)
+    # Cached after cleaning: the raw numeric columns mix numbers with dash placeholders
+    df.to_parquet(cache, engine='pyarrow', compression='zstd', index=False)
+    return df
+
+def read_year(path: Path, year: int) -> pd.DataFrame:
+    read_kwargs = {'sheet_name': SHEET_NAME, 'engine': EXCEL_ENGINE}
     if year == 2024:
         read_kwargs['skiprows'] = 1
-    df = pd.read_excel(path, **read_kwargs)
+    return pd.read_excel(path, **read_kwargs)
 
+def clean_year(df: pd.DataFrame, year: int) -> pd.DataFrame:
     mapping = get_column_mapping(list(df.columns), year)
     df = df.rename(columns={source: target for target, source in mapping.items()})
 
@@ -74,18 +93,15 @@ def load_year(year: int) -> pd.DataFrame:
     return df.reset_index(drop=True)
 
 def build_interim_output(dfs: dict[int, pd.DataFrame]):
+    # Each cleaned year is already stored as Parquet by load_year; only the tidy CSV is added here
     INTERIM_DIR.mkdir(parents=True, exist_ok=True)
 
-    with pd.ExcelWriter(INTERIM_DIR / 'occupation_table12_clean.xlsx', engine='openpyxl') as writer:
-        for year, data in dfs.items():
-            data.to_excel(writer, sheet_name=f'table12_{year}', index=False)
-
     tidy_rows = []
     for year, df in dfs.items():
         tidy = df.assign(year=year)[['year', 'title', 'code', 'type'] + NUMERIC_FIELDS]
         tidy_rows.append(tidy)
     tidy_all = pd.concat(tidy_rows, ignore_index=True)
-    tidy_all.to_csv(INTERIM_DIR / 'occupation_table12_tidy.csv', index=False)
+    write_csv(tidy_all, INTERIM_DIR / 'occupation_table12_tidy.csv')
 
 def build_processed_output(df_2023: pd.DataFrame, df_2024: pd.DataFrame):
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
@@ -98,22 +114,27 @@ def build_processed_output(df_2023: pd.DataFrame, df_2024: pd.DataFrame):
         suffixes=('_2023', '_2024'),
         indicator=True,
     )
+    merged['_merge'] = merged['_merge'].astype(str)
 
     merged['title_2023'] = merged['title_2023'].fillna(merged['title_2024'])
     merged['title_2024'] = merged['title_2024'].fillna(merged['title_2023'])
 
-    for col in NUMERIC_FIELDS:
-        merged[f'{col}_delta'] = merged[f'{col}_2024'] - merged[f'{col}_2023']
+    # All deltas in one 2-D subtraction over the (rows x fields) blocks
+    merged[[f'{col}_delta' for col in NUMERIC_FIELDS]] = (
+        merged[[f'{col}_2024' for col in NUMERIC_FIELDS]].to_numpy(dtype=float)
+        - merged[[f'{col}_2023' for col in NUMERIC_FIELDS]].to_numpy(dtype=float)
+    )
 
     merged.sort_values(['type', 'code'], inplace=True)
 
-    with pd.ExcelWriter(PROCESSED_DIR / 'occupation_table12_comparison.xlsx', engine='openpyxl') as writer:
+    write_parquet(merged, PROCESSED_DIR / 'occupation_table12_comparison.parquet')
+    write_csv(merged, PROCESSED_DIR / 'occupation_table12_comparison.csv')
+
+    # Workbook kept for readers who open the comparison in Excel
+    with pd.ExcelWriter(PROCESSED_DIR / 'occupation_table12_comparison.xlsx', engine=EXCEL_WRITER_ENGINE) as writer:
         for occ_type in ['Summary', 'Line item']:
             mask = merged['type'].str.lower() == occ_type.lower()
-            subset = merged[mask].copy()
-            subset.to_excel(writer, sheet_name=occ_type.replace(' ', '_'), index=False)
-
-    merged.to_csv(PROCESSED_DIR / 'occupation_table12_comparison.csv', index=False)
+            merged[mask].to_excel(writer, sheet_name=occ_type.replace(' ', '_'), index=False)
 
 def main():
     df_2023 = load_year(2023)
@@ -1,19 +1,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from _csv_io import write_csv
+from _lookup import load_segments
 
-LOOKUP_PATH = Path('data/lookups/segment_assignments.csv')
 US_DATA_DIR = Path('data/raw/us_staffing_patterns')
 INTERIM_OUTPUT = Path('data/interim/us_staffing_segments_long_2024_2034.csv')
 PROCESSED_OUTPUT = Path('data/processed/us_staffing_segments_summary.csv')
 PROCESSED_FLAGS = Path('data/processed/us_staffing_segments_flags.csv')
 PROCESSED_SOURCES = Path('data/processed/us_staffing_segment_sources.csv')
 
+# The per-NAICS reads are small and independent, so a few threads overlap their I/O
+MAX_WORKERS = 8
+
 NUMERIC_COLUMNS = [
     '2024 Employment',
     '2024 Percent of Industry',
@@ -25,6 +34,20 @@ NUMERIC_COLUMNS = [
     'Employment Percent Change, 2024-2034',
 ]
 
+# Explicit column types for the per-NAICS CSVs (written by fetch_us_staffing.py); BLS dash
+# placeholders and replacement characters parse straight to null
+TEXT_COLUMNS = ['naics_code', 'Occupation Code', 'Occupation Title', 'Occupation Type']
+US_TABLE_CONVERT_OPTIONS = pa_csv.ConvertOptions(
+    column_types={
+        **{col: pa.string() for col in TEXT_COLUMNS},
+        'source_url': pa.string(),
+        'Display Level': pa.float64(),
+        **{col: pa.float64() for col in NUMERIC_COLUMNS},
+    },
+    null_values=['', 'NA', 'nan', '\u2014', '\u2013', '\ufffd'],
+    strings_can_be_null=True,
+)
+
 SEGMENT_LABELS = {
     1: '1. Materials & Processing',
     2: '2. Equipment Manufacturing',
@@ -51,133 +74,116 @@ def load_us_naics_table(naics_code: str) -> pd.DataFrame:
     path = US_DATA_DIR / f'us_staffing_{naics_code}.csv'
     if not path.exists():
         raise FileNotFoundError(f'Missing US staffing file for NAICS {naics_code}')
-    df = pd.read_csv(path)
-    df['naics_code'] = df['naics_code'].astype(str).str.strip()
+    table = pa_csv.read_csv(path, convert_options=US_TABLE_CONVERT_OPTIONS)
+    for col in TEXT_COLUMNS:
+        table = table.set_column(table.schema.get_field_index(col), col, pc.utf8_trim_whitespace(table[col]))
+    # Text columns stay Arrow-backed, so the rollup groupby hashes Arrow strings rather than Python objects
+    df = table.to_pandas(types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get)
     df['source_code'] = df['source_url'].apply(parse_source_code)
-    df['Occupation Code'] = df['Occupation Code'].astype(str).str.strip()
-    df['Occupation Title'] = df['Occupation Title'].astype(str).str.strip()
-    df['Occupation Type'] = df['Occupation Type'].astype(str).str.strip()
-    df['Display Level'] = pd.to_numeric(df['Display Level'], errors='coerce')
-    for col in NUMERIC_COLUMNS:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
     return df
 
 
-def build_segment_rollup() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    lookup = pd.read_csv(LOOKUP_PATH, dtype={'naics_code': str})
-    segment_ids = sorted(lookup['segment_id'].dropna().unique())
-
-    records = []
-    source_records = []
-
-    for seg_id in segment_ids:
-        seg_naics = (
-            lookup.loc[lookup['segment_id'] == seg_id, 'naics_code']
-            .astype(str)
-            .str.strip()
-            .tolist()
-        )
-        stage = lookup.loc[lookup['segment_id'] == seg_id, 'stage'].iloc[0]
-        seg_label = SEGMENT_LABELS.get(seg_id, f'Segment {seg_id}')
-        seen_sources: Dict[str, List[str]] = {}
-        dataframes = []
-
-        for naics in seg_naics:
-            try:
-                df = load_us_naics_table(naics)
-            except FileNotFoundError:
-                source_records.append({
-                    'segment_id': seg_id,
-                    'segment_name': seg_label,
-                    'naics_code': naics,
-                    'source_code': '',
-                    'source_url': '',
-                    'used_in_segment': False,
-                    'reason': 'missing_us_data',
-                })
-                continue
-            source_code = df['source_code'].iloc[0]
-            source_url = df['source_url'].iloc[0]
-            used = False
-            reason = ''
-
-            if source_code in seen_sources:
-                seen_sources[source_code].append(naics)
-                reason = 'duplicate_source_within_segment'
-            else:
-                seen_sources[source_code] = [naics]
-                dataframes.append(df)
-                used = True
-
-            source_records.append({
-                'segment_id': seg_id,
-                'segment_name': seg_label,
-                'naics_code': naics,
-                'source_code': source_code,
-                'source_url': source_url,
-                'used_in_segment': used,
-                'reason': reason,
-            })
-
-        if not dataframes:
-            continue
-
-        combined = pd.concat(dataframes, ignore_index=True)
-        agg = (
-            combined
-            .groupby(['Occupation Code', 'Occupation Title', 'Occupation Type', 'Display Level'], as_index=False)[NUMERIC_COLUMNS]
-            .sum(min_count=1)
-        )
-        total_row = agg.loc[agg['Occupation Code'] == '00-0000', '2024 Employment']
-        total_2024 = total_row.iloc[0] if not total_row.empty else agg['2024 Employment'].sum()
-        total_row_2034 = agg.loc[agg['Occupation Code'] == '00-0000', 'Projected 2034 Employment']
-        total_2034 = total_row_2034.iloc[0] if not total_row_2034.empty else agg['Projected 2034 Employment'].sum()
-
-        agg['segment_share_2024'] = np.where(
-            total_2024 > 0,
-            agg['2024 Employment'] / total_2024,
-            np.nan,
-        )
-        agg['segment_share_2034'] = np.where(
-            total_2034 > 0,
-            agg['Projected 2034 Employment'] / total_2034,
-            np.nan,
+def preload_us_tables(naics_codes: List[str]) -> Dict[str, Optional[pd.DataFrame]]:
+    """Load each NAICS table once, concurrently; None marks a missing file."""
+    def load(naics: str) -> Optional[pd.DataFrame]:
+        try:
+            return load_us_naics_table(naics)
+        except FileNotFoundError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        return dict(zip(naics_codes, pool.map(load, naics_codes)))
+
+
+def build_segment_rollup() -> tuple[pd.DataFrame, pd.DataFrame, Optional[pd.DataFrame]]:
+    lookup = load_segments()
+    # One pass over the lookup instead of a boolean scan per segment
+    seg_groups = dict(list(lookup.groupby('segment_id')))
+    segment_ids = sorted(seg_groups)
+    naics_by_segment = {
+        seg_id: group['naics_code'].astype(str).str.strip().tolist() for seg_id, group in seg_groups.items()
+    }
+    segment_stages = {seg_id: group['stage'].iat[0] for seg_id, group in seg_groups.items()}
+    # NAICS codes shared by several segments are read only once
+    tables = preload_us_tables(sorted({naics for codes in naics_by_segment.values() for naics in codes}))
+    segment_labels = {seg_id: SEGMENT_LABELS.get(seg_id, f'Segment {seg_id}') for seg_id in segment_ids}
+
+    # One row per (segment, NAICS); within a segment only the first NAICS per BLS source is used
+    source_details = pd.DataFrame(
+        [(seg_id, naics) for seg_id in segment_ids for naics in naics_by_segment[seg_id]],
+        columns=['segment_id', 'naics_code'],
+    )
+    source_details.insert(1, 'segment_name', source_details['segment_id'].map(segment_labels))
+    first_sources = pd.DataFrame(
+        [(naics, df['source_code'].iloc[0], df['source_url'].iloc[0]) for naics, df in tables.items() if df is not None],
+        columns=['naics_code', 'source_code', 'source_url'],
+    )
+    source_details = source_details.merge(first_sources, on='naics_code', how='left', indicator=True)
+    found = source_details.pop('_merge').eq('both')
+    source_details.loc[~found, ['source_code', 'source_url']] = ''
+    duplicate = found & source_details[found].duplicated(['segment_id', 'source_code']).reindex(source_details.index, fill_value=False)
+    source_details['used_in_segment'] = found & ~duplicate
+    source_details['reason'] = np.select(
+        [~found, duplicate], ['missing_us_data', 'duplicate_source_within_segment'], default=''
+    )
+
+    # Every used table tagged with its segment, then a single aggregation across all segments
+    used = source_details[source_details['used_in_segment']]
+    combined = pd.concat(
+        [tables[naics].assign(segment_id=seg_id) for seg_id, naics in zip(used['segment_id'], used['naics_code'])],
+        ignore_index=True,
+    )
+    combined_segments = (
+        combined
+        .groupby(['segment_id', 'Occupation Code', 'Occupation Title', 'Occupation Type', 'Display Level'], as_index=False)[NUMERIC_COLUMNS]
+        .sum(min_count=1)
+    )
+
+    # Segment totals come from the "Total, all occupations" row, else the column sum; both
+    # share columns are then one vectorized divide over all segments
+    empl_cols = ['2024 Employment', 'Projected 2034 Employment']
+    by_segment = combined_segments['segment_id']
+    totals = combined_segments.groupby('segment_id')[empl_cols].sum()
+    total_rows = combined_segments[combined_segments['Occupation Code'] == '00-0000'].drop_duplicates('segment_id')
+    totals.loc[total_rows['segment_id']] = total_rows[empl_cols].to_numpy()
+    denominators = totals.reindex(by_segment).to_numpy(dtype=float)
+    employment = combined_segments[empl_cols].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        combined_segments[['segment_share_2024', 'segment_share_2034']] = np.where(
+            denominators > 0, employment / denominators, np.nan
         )
 
-        agg.insert(0, 'segment_id', seg_id)
-        agg.insert(1, 'segment_name', seg_label)
-        agg.insert(2, 'stage', stage)
-        records.append(agg)
-
-    combined_segments = pd.concat(records, ignore_index=True)
-    source_details = pd.DataFrame(source_records)
-
-    flags = []
-    source_counts = source_details[source_details['used_in_segment']].groupby('source_code')['segment_id'].nunique()
-    for source_code, count in source_counts.items():
-        if count > 1:
-            affected = source_details[source_details['source_code'] == source_code]['segment_id'].unique().tolist()
-            flags.append({
-                'source_code': source_code,
-                'issue': 'shared_across_segments',
-                'segments': ','.join(str(x) for x in sorted(affected)),
-            })
-    duplicates = source_details[source_details['reason'] == 'duplicate_source_within_segment']
-    for _, row in duplicates.iterrows():
-        flags.append({
-            'source_code': row['source_code'],
-            'issue': 'duplicate_within_segment',
-            'segments': str(row['segment_id']),
-        })
-    flags_df = pd.DataFrame(flags).drop_duplicates()
+    combined_segments.insert(1, 'segment_name', by_segment.map(segment_labels))
+    combined_segments.insert(2, 'stage', by_segment.map(segment_stages))
+
+    # Sources feeding more than one segment, and sources skipped as duplicates within a segment;
+    # with neither (the usual case) no flags frame is built
+    used_counts = source_details[source_details['used_in_segment']].groupby('source_code')['segment_id'].nunique()
+    shared_codes = used_counts.index[used_counts > 1]
+    is_duplicate = source_details['reason'] == 'duplicate_source_within_segment'
+    if shared_codes.empty and not is_duplicate.any():
+        return combined_segments, source_details, None
+
+    shared = (
+        source_details[source_details['source_code'].isin(shared_codes)]
+        .groupby('source_code')['segment_id']
+        .agg(lambda ids: ','.join(str(x) for x in sorted(ids.unique())))
+        .reset_index(name='segments')
+        .assign(issue='shared_across_segments')
+    )
+    duplicates = source_details.loc[is_duplicate, ['source_code', 'segment_id']]
+    duplicates = duplicates.assign(issue='duplicate_within_segment', segments=duplicates['segment_id'].astype(str))
+    flags_df = (
+        pd.concat([shared, duplicates], ignore_index=True)[['source_code', 'issue', 'segments']]
+        .drop_duplicates()
+    )
 
     return combined_segments, source_details, flags_df
 
 
 def main() -> None:
     combined_segments, source_details, flags_df = build_segment_rollup()
-    combined_segments.to_csv(INTERIM_OUTPUT, index=False)
+    write_csv(combined_segments, INTERIM_OUTPUT)
 
     summary_cols = [
         'segment_id', 'segment_name', 'stage',
@@ -186,10 +192,10 @@ def main() -> None:
         'Employment Change, 2024-2034', 'Employment Percent Change, 2024-2034',
         'segment_share_2024', 'segment_share_2034'
     ]
-    combined_segments[summary_cols].to_csv(PROCESSED_OUTPUT, index=False)
-    source_details.to_csv(PROCESSED_SOURCES, index=False)
-    if not flags_df.empty:
-        flags_df.to_csv(PROCESSED_FLAGS, index=False)
+    write_csv(combined_segments[summary_cols], PROCESSED_OUTPUT)
+    write_csv(source_details, PROCESSED_SOURCES)
+    if flags_df is not None:
+        write_csv(flags_df, PROCESSED_FLAGS)
     elif PROCESSED_FLAGS.exists():
         PROCESSED_FLAGS.unlink()
 
@@ -3,14 +3,27 @@ Quick validation script to test data availability for occupation forecasts.
 Run this before create_occupation_forecasts.py to catch data issues early.
 """
 
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from _csv_io import read_csv_cached
+
 BASE_DIR = Path(__file__).parent.parent
 DATA_RAW = BASE_DIR / "data" / "raw"
 DATA_INTERIM = BASE_DIR / "data" / "interim"
 DATA_PROCESSED = BASE_DIR / "data" / "processed"
 
+
+def read_table(csv_path, columns=None, filters=None):
+    """Read a CSV via its Parquet copy in data/interim (refreshed when the CSV is newer)."""
+    return read_csv_cached(csv_path, DATA_INTERIM, columns=columns, filters=filters)
+
+
 print("=" * 80)
 print("OCCUPATION FORECAST DATA VALIDATION")
 print("=" * 80)
@@ -18,8 +31,12 @@ print("=" * 80)
 # Test 1: MCDA data
 print("\n[1/6] Checking MCDA data...")
 try:
-    mcda = pd.read_csv(DATA_INTERIM / "mcda_staffing_long_2021_2024.csv")
-    mcda_2024 = mcda[mcda['year'] == 2024]
+    # Only the 2024 rows and the columns checked below are materialized
+    mcda_2024 = read_table(
+        DATA_INTERIM / "mcda_staffing_long_2021_2024.csv",
+        columns=['year', 'segment', 'occcd'],
+        filters=[('year', '==', 2024)],
+    )
 
     # Check for Total rows
     total_rows = len(mcda_2024[mcda_2024['segment'] == 'Total'])
@@ -29,9 +46,11 @@ try:
     mcda_2024 = mcda_2024[mcda_2024['segment'] != 'Total']
     print(f"  ✓ MCDA 2024: {len(mcda_2024)} records (excluding totals)")
 
-    # Extract segment IDs
-    segment_ids = mcda_2024['segment'].str.split('.').str[0].str.strip()
-    print(f"    Segments: {sorted(segment_ids.unique())}")
+    # Extract segment IDs once (the leading number of e.g. "3. Forging & Foundries"); reused in Test 6
+    mcda_2024 = mcda_2024.assign(
+        segment_id=pd.to_numeric(mcda_2024['segment'].str.extract(r'^\s*(\d+)', expand=False)).astype('Int64')
+    )
+    print(f"    Segments: {mcda_2024['segment_id'].dropna().drop_duplicates().sort_values().tolist()}")
     print(f"    Occupations: {mcda_2024['occcd'].nunique()}")
 except Exception as e:
     print(f"  ✗ Error: {e}")
@@ -39,18 +58,18 @@ except Exception as e:
 # Test 2: Segment assignments
 print("\n[2/6] Checking segment assignments...")
 try:
-    segments = pd.read_csv(BASE_DIR / "data" / "lookups" / "segment_assignments.csv")
+    segments = read_table(BASE_DIR / "data" / "lookups" / "segment_assignments.csv")
     print(f"  ✓ Segment assignments: {len(segments)} NAICS codes")
-    print(f"    Segments: {sorted(segments['segment_id'].unique())}")
+    print(f"    Segments: {np.sort(segments['segment_id'].unique()).tolist()}")
 except Exception as e:
     print(f"  ✗ Error: {e}")
 
 # Test 3: Attribution files
 print("\n[3/6] Checking attribution files...")
 try:
-    bea = pd.read_csv(DATA_RAW / "auto_attribution_bea.csv")
+    bea = read_table(DATA_RAW / "auto_attribution_bea.csv")
     print(f"  ✓ BEA attribution: {len(bea)} NAICS codes")
-    lightcast = pd.read_csv(DATA_RAW / "auto_attribution_core_auto_lightcast.csv")
+    lightcast = read_table(DATA_RAW / "auto_attribution_core_auto_lightcast.csv")
     print(f"  ✓ Lightcast attribution: {len(lightcast)} NAICS codes")
 except Exception as e:
     print(f"  ✗ Error: {e}")
@@ -64,31 +83,62 @@ forecast_files = {
     'Lightcast_BLS': 'mi_qcew_segment_employment_timeseries_coreauto_extended_bls.csv',
 }
 
-for key, filename in forecast_files.items():
+def count_forecast_rows(filename):
+    """Number of 2024-2034 rows in a segment forecast, or the exception raised reading it."""
     try:
-        df = pd.read_csv(DATA_PROCESSED / filename)
-        df_24_34 = df[(df['year'] >= 2024) & (df['year'] <= 2034)]
-        print(f"  ✓ {key}: {len(df_24_34)} records (2024-2034)")
+        df_24_34 = read_table(
+            DATA_PROCESSED / filename,
+            columns=['year'],
+            filters=[('year', '>=', 2024), ('year', '<=', 2034)],
+        )
+        return len(df_24_34)
     except Exception as e:
-        print(f"  ✗ {key}: {e}")
+        return e
+
+# The four files are independent, so they are read concurrently; results print in the usual order
+with ThreadPoolExecutor(max_workers=len(forecast_files)) as pool:
+    forecast_counts = pool.map(count_forecast_rows, forecast_files.values())
+for key, count in zip(forecast_files, forecast_counts):
+    if isinstance(count, Exception):
+        print(f"  ✗ {key}: {count}")
+    else:
+        print(f"  ✓ {key}: {count} records (2024-2034)")
 
 # Test 5: BLS staffing patterns
 print("\n[5/6] Checking BLS staffing patterns...")
 try:
     us_staffing_dir = DATA_RAW / "us_staffing_patterns"
-    files = list(us_staffing_dir.glob("us_staffing_*.csv"))
-    print(f"  ✓ BLS staffing files: {len(files)} NAICS codes")
-
-    # Check a sample file
-    sample = pd.read_csv(files[0])
-    print(f"    Sample columns: {list(sample.columns[:5])}")
+    # scandir exposes entry names without a stat per file
+    with os.scandir(us_staffing_dir) as entries:
+        staffing_files = sorted(
+            entry.path for entry in entries
+            if entry.name.startswith("us_staffing_") and entry.name.endswith(".csv")
+        )
+    print(f"  ✓ BLS staffing files: {len(staffing_files)} NAICS codes")
+    if not staffing_files:
+        raise FileNotFoundError(f"No us_staffing_*.csv files in {us_staffing_dir}")
+
+    # Every file's header is checked (header rows only, read concurrently) to catch schema drift
+    def read_header(path):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return next(csv.reader(f), [])
+
+    with ThreadPoolExecutor() as pool:
+        headers = list(pool.map(read_header, staffing_files))
+    print(f"    Sample columns: {headers[0][:5]}")
     required_cols = ['Occupation Code', 'Occupation Title', 'Occupation Type',
                      '2024 Percent of Industry', 'Projected 2034 Percent of Industry']
-    missing = [c for c in required_cols if c not in sample.columns]
-    if missing:
-        print(f"    ✗ Missing columns: {missing}")
+    drifted = {}
+    for path, header in zip(staffing_files, headers):
+        missing = [c for c in required_cols if c not in header]
+        if missing:
+            drifted[Path(path).name] = missing
+    if drifted:
+        print(f"    ✗ Missing columns in {len(drifted)} file(s):")
+        for name, missing in drifted.items():
+            print(f"      {name}: {missing}")
     else:
-        print(f"    ✓ All required columns present")
+        print(f"    ✓ All required columns present in every file")
 except Exception as e:
     print(f"  ✗ Error: {e}")
 
@@ -96,7 +146,7 @@ except Exception as e:
 print("\n[6/6] Checking data alignment...")
 try:
     # Check MCDA segments vs lookup segments
-    mcda_segs = set(mcda_2024['segment'].str.split('.').str[0].str.strip().astype(int).unique())
+    mcda_segs = set(mcda_2024['segment_id'].dropna().astype(int).unique())
     lookup_segs = set(segments['segment_id'].unique())
 
     if mcda_segs == lookup_segs:
@@ -106,20 +156,24 @@ try:
         print(f"    MCDA only: {mcda_segs - lookup_segs}")
         print(f"    Lookup only: {lookup_segs - mcda_segs}")
 
-    # Check NAICS coverage
-    bea_naics = set(bea['NAICS'].values)
-    lightcast_naics = set(lightcast['naics4'].values)
-    segment_naics = set(segments['naics_code'].values)
+    # Check NAICS coverage (Index set operations run on the hashed codes, not Python sets)
+    segment_naics = pd.Index(segments['naics_code'].unique())
+    n_segment = len(segment_naics)
 
     print(f"\n  NAICS coverage:")
-    print(f"    Segments: {len(segment_naics)} codes")
-    print(f"    BEA: {len(segment_naics & bea_naics)}/{len(segment_naics)} covered ({len(segment_naics & bea_naics)/len(segment_naics)*100:.0f}%)")
-    print(f"    Lightcast: {len(segment_naics & lightcast_naics)}/{len(segment_naics)} covered ({len(segment_naics & lightcast_naics)/len(segment_naics)*100:.0f}%)")
-
-    if segment_naics - bea_naics:
-        print(f"    ⚠ Missing in BEA: {sorted(segment_naics - bea_naics)}")
-    if segment_naics - lightcast_naics:
-        print(f"    ⚠ Missing in Lightcast: {sorted(segment_naics - lightcast_naics)}")
+    print(f"    Segments: {n_segment} codes")
+    attribution_naics = {
+        'BEA': pd.Index(bea['NAICS'].unique()),
+        'Lightcast': pd.Index(lightcast['naics4'].unique()),
+    }
+    covered_naics = {label: segment_naics.intersection(codes) for label, codes in attribution_naics.items()}
+    for label, covered in covered_naics.items():
+        print(f"    {label}: {covered.size}/{n_segment} covered ({covered.size/n_segment*100:.0f}%)")
+    # Differences are only computed for sources that do not cover every segment NAICS code
+    for label, covered in covered_naics.items():
+        if covered.size < n_segment:
+            missing_naics = segment_naics.difference(covered)
+            print(f"    ⚠ Missing in {label}: {missing_naics.sort_values().tolist()}")
 
 except Exception as e:
     print(f"  ✗ Error: {e}")
@@ -4,14 +4,16 @@ from pathlib import Path
 def main():
     seg_path = Path("data/lookups/segment_assignments.csv")
     qcew_path = Path("data/raw/QCEW_MI_2024.csv")
-    seg = pd.read_csv(seg_path)
-    seg["naics_code"] = seg["naics_code"].astype(str).str.zfill(4)
-    qcew = pd.read_csv(qcew_path)
-    qcew["naics_code"] = qcew["naics_code"].astype(str).str.zfill(4)
-    merged = seg.merge(qcew[["naics_code", "employment_qcew_2024"]], on="naics_code", how="left")
+    # NAICS codes are 4-digit integers in both files, so they are joined as ints and written
+    # back unchanged, with no zero-padded string keys to build
+    seg = pd.read_csv(seg_path, dtype={"naics_code": "int32"})
+    qcew = pd.read_csv(qcew_path, usecols=["naics_code", "employment_qcew_2024"], dtype={"naics_code": "int32"})
+    # One QCEW row per NAICS code, so the join cannot multiply lookup rows
+    qcew = qcew.drop_duplicates("naics_code")
+    merged = seg.merge(qcew, on="naics_code", how="left", validate="m:1")
     missing = merged["employment_qcew_2024"].isna()
     if missing.any():
-        missing_codes = ", ".join(merged.loc[missing, "naics_code"].tolist())
+        missing_codes = ", ".join(merged.loc[missing, "naics_code"].astype(str).tolist())
         raise ValueError(f"Missing QCEW employment for NAICS codes: {missing_codes}")
     merged.to_csv(seg_path, index=False)
 